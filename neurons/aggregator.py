@@ -105,8 +105,8 @@ class AggregationServer:
         self.param_totalks = {}
         tplr.logger.info("Pre-calculating compression parameters...")
         for name, param in self.model.named_parameters():
-            _, _, shape, totalk = self.compressor.compress(
-                self.transformer.encode(param.data), topk=self.hparams.topk_compression
+            shape, totalk = self.compressor.topk_shape(
+                self.transformer.encoded_shape(param.shape)
             )
             self.param_shapes[name] = shape
             self.param_totalks[name] = totalk
@@ -519,12 +519,15 @@ class AggregationServer:
         backoff = 1  # initial backoff in seconds
         max_backoff = 60  # maximum backoff limit
 
+        # Reused across retries: the substrate interface reopens a closed
+        # websocket on its next request, so only unknown errors need a rebuild.
+        subtensor = None
         while not self.stop_event.is_set():
             try:
+                if subtensor is None:
+                    subtensor = bt.subtensor(config=self.config)
                 # This call subscribes to block headers and might throw keepalive errors
-                bt.subtensor(config=self.config).substrate.subscribe_block_headers(
-                    handler
-                )
+                subtensor.substrate.subscribe_block_headers(handler)
                 backoff = 1  # reset backoff if subscription exits without exception
             except websockets.exceptions.ConnectionClosedError as e:
                 tplr.logger.warning(
@@ -536,6 +539,7 @@ class AggregationServer:
                 tplr.logger.error(
                     f"Block subscription error: {e}. Retrying in {backoff} seconds."
                 )
+                subtensor = None
                 time.sleep(backoff)
                 backoff = min(backoff * 2, max_backoff)
 
@@ -22,9 +22,9 @@ import asyncio
 import json
 import random
 import sys
-import threading
 import time
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from typing import cast
 
 import bittensor as bt
@@ -50,10 +50,12 @@ torch.manual_seed(42)
 torch.cuda.manual_seed_all(42)
 np.random.seed(42)
 random.seed(42)
-torch.backends.cudnn.deterministic = True
-torch.backends.cudnn.benchmark = False
+# bf16 autocast is not bit-exact anyway, so let cuDNN autotune for our fixed shapes
+torch.backends.cudnn.deterministic = False
+torch.backends.cudnn.benchmark = True
 torch.backends.cuda.matmul.allow_tf32 = True
 torch.backends.cudnn.allow_tf32 = True
+torch.set_float32_matmul_precision("high")
 
 
 class Miner:
@@ -87,6 +89,16 @@ class Miner:
             action="store_true",
             help="Local run - use toy model, small enough for a laptop.",
         )
+        parser.add_argument(
+            "--bf16",
+            action="store_true",
+            help="Keep weights and momentum in bf16 instead of autocasting an fp32 model.",
+        )
+        parser.add_argument(
+            "--compile",
+            action="store_true",
+            help="Compile the model forward with torch.compile (reduce-overhead).",
+        )
         bt.subtensor.add_args(parser)
         bt.logging.add_args(parser)
         bt.wallet.add_args(parser)
@@ -119,7 +131,27 @@ class Miner:
         # Init model with hparams config
         self.model = LlamaForCausalLM(self.hparams.model_config)
         self.model.to(self.config.device)  # type: ignore
+        if self.config.bf16:
+            self.model.to(dtype=torch.bfloat16)
         self.tokenizer = self.hparams.tokenizer
+        self.pad_token_id = self.tokenizer.pad_token_id
+
+        # Pinned staging buffer and side stream for batch host-to-device copies
+        self.copy_stream = None
+        if self.model.device.type == "cuda":
+            self.pinned_input_ids = torch.empty(
+                (self.hparams.batch_size, self.hparams.sequence_length),
+                dtype=torch.long,
+                pin_memory=True,
+            )
+            self.copy_stream = torch.cuda.Stream()
+            self.copy_done = torch.cuda.Event()
+
+        # Compile in place so parameter names and state_dict keys are unchanged;
+        # batch shapes are fixed by hparams so a single graph is captured.
+        if self.config.compile:
+            self.model.compile(mode="reduce-overhead", fullgraph=False, dynamic=False)
+            self.warmup_compiled_model()
 
         # Init compression
         self.transformer = tplr.compress.TransformDCT(
@@ -127,18 +159,27 @@ class Miner:
         )
         self.compressor = tplr.compress.CompressDCT()
 
+        # Walk the module tree once; the parameter objects never change
+        self.named_params = list(self.model.named_parameters())
+        self.params = [p for _, p in self.named_params]
+
         # Init optimizer and momentum
-        self.optimizer = SGD(self.model.parameters(), lr=self.hparams.learning_rate)
+        # Fused single-kernel step on CUDA, multi-tensor foreach elsewhere
+        use_fused = self.model.device.type == "cuda"
+        self.optimizer = SGD(
+            self.params,
+            lr=self.hparams.learning_rate,
+            foreach=not use_fused,
+            fused=use_fused,
+        )
         self.momentum = {}
         self.xshapes = {}
         self.totalks = {}
-        for n, p in self.model.named_parameters():
+        for n, p in self.named_params:
             self.momentum[n] = torch.zeros_like(p)
-            _, _, xshape, totalk = self.compressor.compress(
-                self.transformer.encode(self.momentum[n]), self.hparams.topk_compression
+            self.xshapes[n], self.totalks[n] = self.compressor.topk_shape(
+                self.transformer.encoded_shape(p.shape)
             )
-            self.xshapes[n] = xshape
-            self.totalks[n] = totalk
         # Set up scheduler
         warmup_scheduler = LinearLR(
             self.optimizer,
@@ -176,6 +217,8 @@ class Miner:
 
         # Init state params
         self.stop_event = asyncio.Event()
+        # Set (and replaced) on the event loop each time the window advances
+        self.window_changed = asyncio.Event()
         self.current_block = self.subtensor.block
         self.current_window = int(self.current_block / self.hparams.blocks_per_window)
         self.start_window = self.current_window  # Record the start window
@@ -190,6 +233,11 @@ class Miner:
         self.total_tokens_processed = 0
         self.batch_times = []  # For tracking processing speed
 
+        # Handle on the in-flight background checkpoint save
+        self.checkpoint_task: asyncio.Task | None = None
+        self.next_loader_task: asyncio.Task | None = None
+        self.next_loader_window: int | None = None
+
         # Initialize WandB
         self.wandb = tplr.initialize_wandb(
             run_prefix="M",
@@ -215,14 +263,8 @@ class Miner:
 
     # Main training loop.
     async def run(self):
-        # Start background block listener
-        self.loop = asyncio.get_running_loop()
-        self.listener = threading.Thread(
-            target=self.block_listener,
-            args=(self.loop,),
-            daemon=True,
-        )
-        self.listener.start()  #
+        # Start background block listener on the event loop
+        self.listener = asyncio.create_task(self.block_listener())
 
         # Use config peers if provided
         if self.config.peers:
@@ -253,7 +295,10 @@ class Miner:
             device=cast(str, self.config.device),
         )
         if success:
-            self.momentum = loaded_momentum
+            self.momentum = {
+                n: loaded_momentum[n].to(device=p.device, dtype=p.dtype)
+                for n, p in self.named_params
+            }
             self.global_step = loaded_checkpoint_window - self.start_window
             self.optimizer = loaded_optimizer
             self.scheduler = loaded_scheduler
@@ -274,9 +319,7 @@ class Miner:
                 tplr.logger.info("Checkpoint is up-to-date, skipping catchup.")
         else:
             tplr.logger.info("No checkpoint found, initializing model from scratch")
-            self.momentum = {
-                n: torch.zeros_like(p) for n, p in self.model.named_parameters()
-            }
+            self.momentum = {n: torch.zeros_like(p) for n, p in self.named_params}
             self.model.to(self.config.device)  # type: ignore
 
             # Catch up with aggregation server from start window.
@@ -304,18 +347,26 @@ class Miner:
                 instance=self, window=step_window, peer_start=peer_start
             )
 
+            # Start the gather in the background. It waits for the window to end,
+            # so peer downloads overlap with our compression and upload.
+            gather_task = asyncio.create_task(self.gather_window(step_window))
+
             # 2. Load training data for this window
             data_start = tplr.T()
-            pages = await tplr.r2_dataset.R2DatasetLoader.next_pages(
-                offset=step_window,
-                n_pages=self.hparams.pages_per_window,
-                seed=self.uid,  # type: ignore
-            )
-            loader = await tplr.r2_dataset.R2DatasetLoader.create(
-                batch_size=self.hparams.batch_size,
-                sequence_length=self.hparams.sequence_length,
-                pages_info=pages,
-                tokenizer=self.tokenizer,
+            if (
+                self.next_loader_task is not None
+                and self.next_loader_window == step_window
+            ):
+                pages, loader = await self.next_loader_task
+            else:
+                # Prefetched window was skipped (or this is the first window)
+                if self.next_loader_task is not None:
+                    self.next_loader_task.cancel()
+                pages, loader = await self.load_window_data(step_window)
+            # Prefetch the next window's pages while this one trains
+            self.next_loader_window = step_window + 1
+            self.next_loader_task = asyncio.create_task(
+                self.load_window_data(self.next_loader_window)
             )
             tplr.logger.info(
                 f"{tplr.P(step_window, tplr.T() - data_start)} Loaded training data"
@@ -327,61 +378,75 @@ class Miner:
             # 3. Accumulate gradients over batches
             train_start = tplr.T()
             tplr.logger.info("Start accumulating...")
-            self.optimizer.zero_grad()
-            self.model.zero_grad()
-            total_loss = 0.0
+            self.optimizer.zero_grad(set_to_none=True)
+            batch_losses = []  # kept on device, synced once after the loop
             n_batches = 0
             window_tokens = 0  # Initialize token count for this window
 
             for i, batch in enumerate(loader):
-                input_ids = torch.tensor(batch, dtype=torch.long).to(self.model.device)
+                input_ids = self.batch_to_device(batch)
                 tokens_this_batch = input_ids.numel()  # Tokens in current batch
                 window_tokens += tokens_this_batch  # Accumulate tokens
-                labels = input_ids.clone()
-                labels = torch.where(
-                    labels == self.tokenizer.pad_token_id, -100, labels
-                )
-
-                with autocast(device_type=self.model.device.type, dtype=torch.bfloat16):
+                labels = input_ids.masked_fill(input_ids == self.pad_token_id, -100)
+
+                # A bf16 model already runs natively in half precision
+                with autocast(
+                    device_type=self.model.device.type,
+                    dtype=torch.bfloat16,
+                    enabled=not self.config.bf16,
+                ):
                     outputs = self.model(input_ids=input_ids, labels=labels)
+                loss = outputs.loss.float()
 
-                total_loss += outputs.loss.item()
-                outputs.loss.backward()
+                # Clone so a CUDA-graph replay (--compile) can't overwrite it
+                batch_losses.append(loss.detach().clone())
+                loss.backward()
                 n_batches += 1
-                tplr.logger.info(f"loss: {outputs.loss.item()} [Batch {i + 1}]")
+                # Let the block listener and background tasks run between batches
+                await asyncio.sleep(0)
                 if self.current_window != step_window:
                     tplr.logger.info("<Exhausted window>")
                     break
 
+            # Single device-to-host sync for every batch loss of the window
+            losses = torch.stack(batch_losses).tolist() if batch_losses else []
+            for i, batch_loss in enumerate(losses):
+                tplr.logger.info(f"loss: {batch_loss} [Batch {i + 1}]")
+            total_loss = sum(losses)
+
             # If training completes before the window is exhausted, wait until the window ends.
             if self.current_window == step_window:
                 tplr.logger.info(
                     "Training complete; waiting for window to be exhausted..."
                 )
-                while self.current_window == step_window:
-                    await asyncio.sleep(
-                        0.1
-                    )  # TODO: Consider adding a timeout safeguard here.
+                # TODO: Consider adding a timeout safeguard here.
+                await self.wait_for_window_change(step_window)
             tplr.logger.info(
                 f"{tplr.P(step_window, tplr.T() - train_start)} Completed training"
             )
 
             compress_start = tplr.T()
-            gradient, xshapes, totalks, _ = tplr.prepare_gradient_dict(
-                self, pages, step_window
+            # Compression runs in a worker thread so the block listener's
+            # websocket keeps being serviced on the event loop meanwhile
+            gradient, xshapes, totalks, _ = await asyncio.to_thread(
+                tplr.prepare_gradient_dict, self, pages, step_window
             )
             tplr.logger.info(
                 f"{tplr.P(step_window, tplr.T() - compress_start)} Compressed local gradients"
             )
             tplr.logger.debug(f"Putting own state dict for UID {self.uid}")
 
-            # Move everything to CPU before upload
-            processed_state_dict = {}
-            for k, v in gradient.items():
-                if isinstance(v, torch.Tensor):
-                    processed_state_dict[k] = v.to("cpu")
-                else:
-                    processed_state_dict[k] = v
+            # Peers and validators expect fp32 values on the wire
+            if self.config.bf16:
+                gradient = {
+                    k: v.float()
+                    if isinstance(v, torch.Tensor) and v.dtype == torch.bfloat16
+                    else v
+                    for k, v in gradient.items()
+                }
+            # Copy into reusable pinned buffers without stalling on each tensor
+            processed_state_dict = self.comms.stage_tensors("gradient", gradient)
+            await self.comms.wait_for_staged_tensors()
 
             # Launch the put operation as a background task
             put_completion_time = await self.comms.put(
@@ -406,146 +471,61 @@ class Miner:
 
             tplr.logger.info(f"Stopped accumulating: {n_batches} batches")
 
-            sync_block = self.current_window * self.hparams.blocks_per_window
-            retries = 0
-            delay = 1
-            max_retries = 5
-            max_delay = 60
-            while True:
-                try:
-                    response = self.subtensor.query_module(
-                        "Timestamp", "Now", block=sync_block
-                    )
-                    if response is None or not isinstance(response, ScaleObj):
-                        raise ValueError(f"Could not query timestamp for {sync_block}")
-                    ts_value = (
-                        cast(int, response.value) / 1000
-                    )  # convert milliseconds to seconds
-                    break
-                except Exception as e:
-                    tplr.logger.error(
-                        f"Failed to query timestamp for block {sync_block}: {str(e)}. Retry {retries + 1}/{max_retries}"
-                    )
-                    retries += 1
-                    if retries > max_retries:
-                        tplr.logger.error(
-                            "Exceeded maximum retries for timestamp query."
-                        )
-                        raise e
-                    time.sleep(delay)
-                    delay = min(delay * 2, max_delay)
-
-            time_min = datetime.fromtimestamp(ts_value, tz=timezone.utc)
-            time_max = time_min + timedelta(
-                seconds=self.hparams.time_window_delta_seconds
-            )
-
-            # Log the time window we're using
-            tplr.logger.info(f"Using time window for gather: {time_min} to {time_max}")
-
-            # Refresh the peers list immediately before gathering
-            tplr.logger.info("Refreshing peers before gather task...")
-
-            if self.config.test:
-                # In test mode, use all UIDs from metagraph except self
-                tplr.logger.info("Test mode active: Using all peers from metagraph.")
-                all_uids = list(range(len(self.metagraph.S)))
-                self.comms.peers = [uid for uid in all_uids if uid != self.uid]
-
-            tplr.logger.info(f"Final peers for gather: {self.comms.peers}")
-
-            gather_start = tplr.T()
-            tplr.logger.info("Waiting on gather task...")
-            gather_result = await self.comms.gather(
-                my_uid=self.uid,
-                uids=self.comms.peers,
-                window=step_window,
-                key="gradient",
-                timeout=35,
-                device="cpu",
-                local=False,
-                stale_retention=100,
-                totalks=self.totalks,
-                time_min=time_min,
-                time_max=time_max,
-            )
-            tplr.logger.info("Gather task completed!")
-            gather_time = tplr.T() - gather_start
-
             # 5. Calculate and log metrics
             duration = time.time() - train_start
             self.batch_times.append(duration)
             self.total_tokens_processed += window_tokens
             tokens_per_sec = window_tokens / duration
 
-            grad_norms = [
-                p.grad.norm().item()
-                for p in self.model.parameters()
-                if p.grad is not None
-            ]
-            weight_norms = [p.norm().item() for p in self.model.parameters()]
-            momentum_norms = [m.norm().item() for m in self.momentum.values()]
-            self.wandb.log(
-                {
-                    # Training metrics
-                    "miner/loss": total_loss / n_batches if n_batches > 0 else 0,
-                    "miner/tokens_per_sec": tokens_per_sec,
-                    "miner/batch_duration": duration,
-                    "miner/total_tokens": self.total_tokens_processed,
-                    "miner/batch_tokens": window_tokens,
-                    "miner/global_step": self.global_step,
-                    # Resource metrics
-                    "miner/gpu_memory_allocated": torch.cuda.memory_allocated()
-                    / 1024**2,  # MB
-                    "miner/gpu_memory_cached": torch.cuda.memory_reserved()
-                    / 1024**2,  # MB
-                    # Network metrics
-                    "miner/gather_peers": len(self.comms.peers),
-                    "miner/effective_batch_size": len(self.comms.peers)
-                    * self.hparams.batch_size,
-                    # Optimization metrics
-                    "miner/learning_rate": self.scheduler.get_last_lr()[0],
-                    # Gradient statistics as points
-                    "miner/mean_grad_norm": sum(grad_norms) / len(grad_norms)
-                    if grad_norms
-                    else 0,
-                    "miner/max_grad_norm": max(grad_norms) if grad_norms else 0,
-                    "miner/min_grad_norm": min(grad_norms) if grad_norms else 0,
-                    "miner/grad_norm_std": torch.tensor(grad_norms).std().item()
-                    if grad_norms
-                    else 0,
-                    "miner/mean_weight_norm": sum(weight_norms) / len(weight_norms),
-                    "miner/mean_momentum_norm": sum(momentum_norms)
-                    / len(momentum_norms),
-                },
-                step=self.global_step,
+            # Compute all norm statistics on device and sync them in one transfer
+            grads = [p.grad for p in self.params if p.grad is not None]
+            weight_norms = torch.stack(torch._foreach_norm(self.params)).float()
+            momentum_norms = torch.stack(
+                torch._foreach_norm(list(self.momentum.values()))
+            ).float()
+            norm_stats = [weight_norms.mean(), momentum_norms.mean()]
+            if grads:
+                grad_norms = torch.stack(torch._foreach_norm(grads)).float()
+                grad_norm_std, mean_grad_norm = torch.std_mean(grad_norms)
+                min_grad_norm, max_grad_norm = torch.aminmax(grad_norms)
+                norm_stats += [
+                    mean_grad_norm,
+                    max_grad_norm,
+                    min_grad_norm,
+                    grad_norm_std,
+                ]
+            norm_stats = torch.stack(norm_stats).tolist()
+            mean_weight_norm, mean_momentum_norm = norm_stats[:2]
+            mean_grad_norm, max_grad_norm, min_grad_norm, grad_norm_std = (
+                norm_stats[2:] if grads else (0, 0, 0, 0)
             )
 
             # ---------------------------------------------------------------------
-            # 6. Await both gather
+            # 6. Await the background gather
             # ---------------------------------------------------------------------
+            tplr.logger.info("Waiting on gather task...")
+            gather_result, gather_time = await gather_task
+            tplr.logger.info("Gather task completed!")
 
             # 8. Apply gathered gradients
             update_start = tplr.T()
             self.model.train()
-            self.optimizer.zero_grad()
+            self.optimizer.zero_grad(set_to_none=True)
 
             if gather_result is not None and gather_result.state_dict is not None:
-                for n, p in self.model.named_parameters():
+                new_grads = []
+                for n, p in self.named_params:
                     idxs_key = n + "idxs"
                     vals_key = n + "vals"
                     idxs = getattr(gather_result.state_dict, idxs_key, None)
                     vals = getattr(gather_result.state_dict, vals_key, None)
                     if idxs is not None and vals is not None:
-                        if not isinstance(idxs, (list, tuple)):
-                            idxs = [idxs]
-                        if not isinstance(vals, (list, tuple)):
-                            vals = [vals]
+                        # Peer tensors were concatenated during the gather
                         new_grad = self.transformer.decode(
-                            self.compressor.batch_decompress(
-                                p.to(self.config.device),
-                                idxs,
-                                vals,
+                            self.compressor.decompress(
+                                p,
+                                idxs.to(p.device, non_blocking=True),
+                                vals.to(p.device, non_blocking=True),
                                 xshapes[n],
                                 totalks[n],
                             )
@@ -555,12 +535,16 @@ class Miner:
                             p.grad = new_grad
                         else:
                             p.grad.copy_(new_grad)
-                        p.grad.sign_()
+                        new_grads.append(p.grad)
                     else:
                         tplr.logger.info(
                             f"Gradient data missing for parameter {n}, skipping."
                         )
 
+                # Take the sign of every gradient in a single fused launch
+                if new_grads:
+                    torch._foreach_sign_(new_grads)
+
                 tplr.logger.info(
                     f"{tplr.P(self.start_window, tplr.T() - update_start)} Updated model"
                 )
@@ -577,14 +561,20 @@ class Miner:
             # Add debug data including successfully gathered peers
             debug_dict = {}
 
-            # Add model parameters debug info
-            for name, param in self.model.named_parameters():
-                if (
-                    param is not None and param.numel() >= 2
-                ):  # Check if tensor has at least 2 elements
-                    debug_dict[name + "_debug"] = (
-                        param.flatten()[10:12].detach().cpu().tolist()
-                    )
+            # Add model parameters debug info, copied to host in a single transfer
+            debug_params = [
+                (name, param.detach().flatten()[10:12])
+                for name, param in self.named_params
+                if param.numel() >= 2  # Check if tensor has at least 2 elements
+            ]
+            if debug_params:
+                debug_values = torch.cat([v for _, v in debug_params]).tolist()
+                offset = 0
+                for name, v in debug_params:
+                    debug_dict[name + "_debug"] = debug_values[
+                        offset : offset + v.numel()
+                    ]
+                    offset += v.numel()
 
             # Add successful peers information
             if gather_result is not None:
@@ -611,14 +601,6 @@ class Miner:
 
             # Calculate common metrics values
             loss_value = total_loss / n_batches if n_batches > 0 else 0
-            mean_grad_norm = sum(grad_norms) / len(grad_norms) if grad_norms else 0
-            grad_norm_std = torch.tensor(grad_norms).std().item() if grad_norms else 0
-            mean_weight_norm = (
-                sum(weight_norms) / len(weight_norms) if weight_norms else 0
-            )
-            mean_momentum_norm = (
-                sum(momentum_norms) / len(momentum_norms) if momentum_norms else 0
-            )
             window_total_time = tplr.T() - window_start
             peer_update_time = tplr.T() - peer_start
             data_loading_time = tplr.T() - data_start
@@ -644,6 +626,7 @@ class Miner:
                     # Existing metrics
                     "miner/loss": loss_value,
                     "miner/tokens_per_sec": tokens_per_sec,
+                    "miner/batch_duration": duration,
                     "miner/total_tokens": self.total_tokens_processed,
                     "miner/batch_tokens": window_tokens,
                     "miner/global_step": self.global_step,
@@ -655,8 +638,8 @@ class Miner:
                     * self.hparams.batch_size,
                     "miner/learning_rate": self.scheduler.get_last_lr()[0],
                     "miner/mean_grad_norm": mean_grad_norm,
-                    "miner/max_grad_norm": max(grad_norms) if grad_norms else 0,
-                    "miner/min_grad_norm": min(grad_norms) if grad_norms else 0,
+                    "miner/max_grad_norm": max_grad_norm,
+                    "miner/min_grad_norm": min_grad_norm,
                     "miner/grad_norm_std": grad_norm_std,
                     "miner/mean_weight_norm": mean_weight_norm,
                     "miner/mean_momentum_norm": mean_momentum_norm,
@@ -702,8 +685,13 @@ class Miner:
                     f"Creating checkpoint at global_step {self.global_step}"
                 )
 
+                # The staging buffers are reused, so let the previous save finish
+                if self.checkpoint_task is not None and not self.checkpoint_task.done():
+                    tplr.logger.info("Waiting for previous checkpoint save...")
+                    await self.checkpoint_task
+
                 # asyncio checkpoint saving task
-                asyncio.create_task(
+                self.checkpoint_task = asyncio.create_task(
                     self.comms.save_checkpoint(
                         model=self.model,
                         optimizer=self.optimizer,
@@ -719,20 +707,184 @@ class Miner:
 
             # 4. Wait for next window
             tplr.logger.info("Wait for next window...")
-            while self.current_window == step_window:
-                await asyncio.sleep(0.1)
+            await self.wait_for_window_change(step_window)
+
+    def warmup_compiled_model(self) -> None:
+        """Trigger compilation with one dummy batch before the main loop."""
+        tplr.logger.info("Compiling model forward...")
+        start = tplr.T()
+        input_ids = torch.zeros(
+            (self.hparams.batch_size, self.hparams.sequence_length),
+            dtype=torch.long,
+            device=self.model.device,
+        )
+        with autocast(
+            device_type=self.model.device.type,
+            dtype=torch.bfloat16,
+            enabled=not self.config.bf16,
+        ):
+            outputs = self.model(input_ids=input_ids, labels=input_ids)
+        outputs.loss.backward()
+        self.model.zero_grad(set_to_none=True)
+        tplr.logger.info(f"Model compiled in {tplr.T() - start:.2f}s")
+
+    async def load_window_data(self, window: int):
+        """Fetch and tokenize the training pages for `window`.
+
+        Returns:
+            tuple: (pages, loader)
+        """
+        pages = await tplr.r2_dataset.R2DatasetLoader.next_pages(
+            offset=window,
+            n_pages=self.hparams.pages_per_window,
+            seed=self.uid,  # type: ignore
+        )
+        loader = await tplr.r2_dataset.R2DatasetLoader.create(
+            batch_size=self.hparams.batch_size,
+            sequence_length=self.hparams.sequence_length,
+            pages_info=pages,
+            tokenizer=self.tokenizer,
+        )
+        return pages, loader
+
+    def batch_to_device(self, batch) -> torch.Tensor:
+        """Move a token batch to the model device.
+
+        On CUDA the batch is staged through a pinned buffer and copied on a side
+        stream with non_blocking=True, so the copy does not stall the host.
+        """
+        if self.copy_stream is None:
+            return torch.as_tensor(batch, dtype=torch.long).to(self.model.device)
+
+        # The previous copy must finish reading the pinned buffer before reuse
+        self.copy_done.synchronize()
+        self.pinned_input_ids.copy_(torch.as_tensor(batch, dtype=torch.long))
+        with torch.cuda.stream(self.copy_stream):
+            input_ids = self.pinned_input_ids.to(self.model.device, non_blocking=True)
+            self.copy_done.record()
+        torch.cuda.current_stream().wait_stream(self.copy_stream)
+        # input_ids was allocated on the copy stream but is consumed on the main one
+        input_ids.record_stream(torch.cuda.current_stream())
+        return input_ids
+
+    def query_sync_timestamp(self, sync_block: int) -> float:
+        """Query the chain timestamp (in seconds) of `sync_block`, with retries."""
+        retries = 0
+        delay = 1
+        max_retries = 5
+        max_delay = 60
+        while True:
+            try:
+                response = self.subtensor.query_module(
+                    "Timestamp", "Now", block=sync_block
+                )
+                if response is None or not isinstance(response, ScaleObj):
+                    raise ValueError(f"Could not query timestamp for {sync_block}")
+                return cast(int, response.value) / 1000  # convert ms to seconds
+            except Exception as e:
+                tplr.logger.error(
+                    f"Failed to query timestamp for block {sync_block}: {str(e)}. Retry {retries + 1}/{max_retries}"
+                )
+                retries += 1
+                if retries > max_retries:
+                    tplr.logger.error("Exceeded maximum retries for timestamp query.")
+                    raise e
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+    async def gather_window(
+        self, step_window: int
+    ) -> tuple[SimpleNamespace | None, float]:
+        """Gather peer gradients for `step_window` once its time bounds are known.
+
+        Runs as a background task started before local training. It waits for
+        the window change that also ends training, so the peer downloads
+        overlap with our gradient compression and upload.
+
+        Returns:
+            tuple: (gather_result, gather_time)
+        """
+        # Peers upload once the window is over, and the time bounds are anchored
+        # on the first block of the next window.
+        await self.wait_for_window_change(step_window)
+
+        sync_block = (step_window + 1) * self.hparams.blocks_per_window
+        ts_value = await asyncio.to_thread(self.query_sync_timestamp, sync_block)
+        time_min = datetime.fromtimestamp(ts_value, tz=timezone.utc)
+        time_max = time_min + timedelta(seconds=self.hparams.time_window_delta_seconds)
+
+        # Log the time window we're using
+        tplr.logger.info(f"Using time window for gather: {time_min} to {time_max}")
+
+        # Refresh the peers list immediately before gathering
+        tplr.logger.info("Refreshing peers before gather task...")
+
+        if self.config.test:
+            # In test mode, use all UIDs from metagraph except self
+            tplr.logger.info("Test mode active: Using all peers from metagraph.")
+            all_uids = list(range(len(self.metagraph.S)))
+            self.comms.peers = [uid for uid in all_uids if uid != self.uid]
+
+        tplr.logger.info(f"Final peers for gather: {self.comms.peers}")
+
+        gather_start = tplr.T()
+        gather_result = await self.comms.gather(
+            my_uid=self.uid,
+            uids=self.comms.peers,
+            window=step_window,
+            key="gradient",
+            timeout=35,
+            device="cpu",
+            local=False,
+            stale_retention=100,
+            totalks=self.totalks,
+            time_min=time_min,
+            time_max=time_max,
+        )
+        if gather_result is not None:
+            self.stage_gathered_gradients(gather_result.state_dict)
+        return gather_result, tplr.T() - gather_start
+
+    def stage_gathered_gradients(self, state_dict: SimpleNamespace) -> None:
+        """Concatenate each parameter's per-peer idxs/vals into one tensor.
+
+        Done inside the background gather so the update phase issues a single
+        host-to-device copy per tensor instead of one per peer. Buffers are
+        pinned on CUDA so that copy can be non-blocking.
+        """
+        pin = self.copy_stream is not None
+        for key, value in vars(state_dict).items():
+            if not key.endswith(("idxs", "vals")):
+                continue
+            if isinstance(value, (list, tuple)):
+                value = torch.cat(value, dim=-1)
+            if pin:
+                value = value.pin_memory()
+            setattr(state_dict, key, value)
+
+    def notify_window_change(self) -> None:
+        """Wake every waiter on the current window."""
+        self.window_changed.set()
+        self.window_changed = asyncio.Event()
+
+    async def wait_for_window_change(self, window: int) -> None:
+        """Wait until the block listener moves past `window`."""
+        while self.current_window == window:
+            await self.window_changed.wait()
 
     # Listens for new blocks and sets self.current_block and self.current_window
-    def block_listener(self, _):
+    async def block_listener(self):
+        import websockets
         import websockets.exceptions  # Ensure we catch websockets errors
 
-        def handler(event):
+        def handler(header):
             try:
-                self.current_block = int(event["header"]["number"])
+                self.current_block = int(header["number"], 16)
                 new_window = int(self.current_block / self.hparams.blocks_per_window)
                 if new_window != self.current_window:
                     self.current_window = new_window
                     self.comms.current_window = self.current_window
+                    self.notify_window_change()
                     tplr.logger.info(
                         f"New block received. Current window updated to: {self.current_window}"
                     )
@@ -741,28 +893,48 @@ class Miner:
 
         backoff = 1  # initial backoff in seconds
         max_backoff = 60  # maximum backoff limit
+        subscribe = json.dumps(
+            {"jsonrpc": "2.0", "id": 1, "method": "chain_subscribeNewHeads"}
+        )
 
         while not self.stop_event.is_set():
             try:
-                # This call subscribes to block headers and might throw keepalive errors
-                bt.subtensor(config=self.config).substrate.subscribe_block_headers(
-                    handler
+                # The listener shares the event loop with training, so allow
+                # pongs to be late by up to two minutes of synchronous work
+                # before treating the connection as dead
+                async with websockets.connect(
+                    self.subtensor.chain_endpoint, ping_interval=20, ping_timeout=120
+                ) as ws:
+                    await ws.send(subscribe)
+                    backoff = 1  # reset backoff once connected
+                    async for message in ws:
+                        # The first reply only acknowledges the subscription
+                        header = json.loads(message).get("params", {}).get("result")
+                        if header is not None:
+                            handler(header)
+                tplr.logger.warning(
+                    f"Block subscription closed by server. Reconnecting in {backoff} seconds."
                 )
-                backoff = 1  # reset backoff if subscription exits without exception
             except websockets.exceptions.ConnectionClosedError as e:
                 tplr.logger.warning(
                     f"Websocket ConnectionClosedError caught: {e}. Retrying in {backoff} seconds."
                 )
-                time.sleep(backoff)
-                backoff = min(backoff * 2, max_backoff)
             except Exception as e:
                 tplr.logger.error(
                     f"Block subscription error: {e}. Retrying in {backoff} seconds."
                 )
-                time.sleep(backoff)
-                backoff = min(backoff * 2, max_backoff)
+            # Back off on every exit, including a clean close, so a server that
+            # keeps closing cannot drive a tight reconnect loop
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff)
 
 
 # Start miner.
 if __name__ == "__main__":
-    asyncio.run(Miner().run())
+    # uvloop is optional; the listener and I/O run on it when installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(Miner().run())
+    else:
+        uvloop.run(Miner().run())
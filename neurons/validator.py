@@ -19,26 +19,32 @@
 import argparse
 import asyncio
 import copy
+import logging
 import os
 import random
 import sys
 import threading
 import time
 from collections import defaultdict
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta, timezone
 from io import StringIO
 from time import perf_counter
 from types import SimpleNamespace
 from typing import cast
 
+# Must be set before torch initialises CUDA. Expandable segments let the
+# allocator grow one reservation in place instead of fragmenting it across
+# the gather, eval and checkpoint transients.
+os.environ.setdefault(
+    "PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:512"
+)
+
 import bittensor as bt
 import numpy as np
 
 # Third party
 import torch
-from rich.console import Console
-from rich.table import Table
 from torch.optim import SGD
 from torch.optim.lr_scheduler import (
     CosineAnnealingWarmRestarts,
@@ -110,6 +116,11 @@ class Validator:
             action="store_true",
             help="Logs to the entity you are signed in to if true, else to the public 'tplr'.",
         )
+        parser.add_argument(
+            "--compile",
+            action="store_true",
+            help="Compile the eval forward and the gradient decompress + decode path with torch.compile.",
+        )
         bt.subtensor.add_args(parser)
         bt.logging.add_args(parser)
         bt.wallet.add_args(parser)
@@ -148,29 +159,81 @@ class Validator:
         except Exception as e:
             tplr.logger.warning(f"Failed to initialize Loki logging: {e}")
 
-        # Init model with hparams config
+        # Init model with hparams config. All device work runs on the default
+        # stream (the block listener thread never touches CUDA), so freed
+        # blocks stay in the one per-stream pool and are reused.
         self.model = LlamaForCausalLM(self.hparams.model_config)
         self.model.to(self.config.device)
         self.tokenizer = self.hparams.tokenizer
 
+        # Scratch copy that peer gradients are applied to during evaluation.
+        # Its weights are reset in place from self.model before each use
+        # instead of deep-copying the model for every evaluated UID.
+        self.eval_model = copy.deepcopy(self.model)
+        self.eval_params = list(self.eval_model.parameters())
+
+        # Compile in place so the parameter list above stays valid; eval
+        # batches are always batch_size x sequence_length, so one graph is
+        # captured and replayed for every loss pass.
+        if self.config.compile:
+            self.eval_model.compile(
+                mode="reduce-overhead", fullgraph=False, dynamic=False
+            )
+            self.warmup_compiled_eval_model()
+
         # Init compression
         self.transformer = tplr.compress.TransformDCT(
             self.model, target_chunk=self.hparams.target_chunk
         )
         self.compressor = tplr.compress.CompressDCT()
 
+        def recompose(p, idxs, vals, xshape, totalk):
+            return self.transformer.decode(
+                self.compressor.decompress(p, idxs, vals, xshape, totalk)
+            )
+
+        # Shapes are fixed per parameter, so each one compiles once. The
+        # default mode is used because CUDA-graph outputs (reduce-overhead)
+        # would be overwritten while earlier grads are still held.
+        self.recompose = recompose
+        if self.config.compile:
+            self.recompose = torch.compile(recompose, dynamic=False)
+
+        # Private allocator pool for the per-UID eval scratch (decompressed
+        # grads, loss-loop activations). It is swapped for a
+        # fresh pool after each eval pass so those transients never fragment
+        # the pool holding the resident model state.
+        self.eval_pool = (
+            torch.cuda.MemPool()
+            if str(self.config.device).startswith("cuda")
+            and hasattr(torch.cuda, "MemPool")
+            else None
+        )
+
+        # Side stream for decompressing peer gradients while the eval forward
+        # passes run on the default stream.
+        self.decode_stream = (
+            torch.cuda.Stream() if str(self.config.device).startswith("cuda") else None
+        )
+
+        # Handles on the in-flight background checkpoint upload and score table
+        self.checkpoint_task: asyncio.Task | None = None
+        self.score_table_task: asyncio.Task | None = None
+
         # Init optimizer and momentum
         self.optimizer = SGD(self.model.parameters(), lr=self.hparams.learning_rate)
+        # Momentum is allocated per parameter when apply_gathered_gradients
+        # first writes it, rather than as a full model copy up front
         self.momentum = {}
         self.xshapes = {}
         self.totalks = {}
         for n, p in self.model.named_parameters():
-            self.momentum[n] = torch.zeros_like(p)
-            _, _, xshape, totalk = self.compressor.compress(
-                self.transformer.encode(self.momentum[n]), self.hparams.topk_compression
+            self.xshapes[n], self.totalks[n] = self.compressor.topk_shape(
+                self.transformer.encoded_shape(p.shape)
             )
-            self.xshapes[n] = xshape
-            self.totalks[n] = totalk
+        # State dict keys per parameter, in named_parameters() order, so the
+        # apply loops don't rebuild them for every parameter of every peer
+        self.param_keys = [(n, n + "idxs", n + "vals") for n in self.xshapes]
 
         # Set up scheduler setup
         warmup_scheduler = LinearLR(
@@ -284,6 +347,121 @@ class Validator:
         self.next_peers: tplr.comms.PeerArray | None = None
         self.peers_update_window = -1
 
+    @contextmanager
+    def eval_scratch(self):
+        """Route CUDA allocations to the private eval pool, if there is one.
+
+        Only enter this around synchronous code: the pool applies to every
+        allocation made by the thread, including other tasks on the loop.
+        """
+        if self.eval_pool is None:
+            yield
+            return
+        with torch.cuda.use_mem_pool(self.eval_pool):
+            yield
+
+    @torch.no_grad()
+    def reset_eval_model(self) -> LlamaForCausalLM:
+        """Copy the current weights into the preallocated eval model."""
+        for dst, src in zip(self.eval_params, self.model.parameters()):
+            dst.copy_(src, non_blocking=True)
+        return self.eval_model
+
+    def decode_eval_gradient(
+        self, model: LlamaForCausalLM, state_dict: dict
+    ) -> tuple[list[torch.Tensor], list[torch.Tensor]]:
+        """Decompress a peer gradient for `model` on the decode stream.
+
+        Returns the matching parameter and gradient lists. When a decode stream
+        is in use, the current stream must wait on it before the grads are read.
+        """
+        stream_ctx = nullcontext()
+        if self.decode_stream is not None:
+            # Inputs were produced on the default stream
+            self.decode_stream.wait_stream(torch.cuda.current_stream())
+            stream_ctx = torch.cuda.stream(self.decode_stream)
+
+        params, grads = [], []
+        with stream_ctx:
+            for (n, idxs_key, vals_key), p in zip(self.param_keys, model.parameters()):
+                idxs = state_dict.get(idxs_key, None)
+                vals = state_dict.get(vals_key, None)
+                if idxs is None or vals is None:
+                    continue
+                grad = self.recompose(
+                    p,
+                    idxs.to(self.config.device),
+                    vals.to(self.config.device),
+                    self.xshapes[n],
+                    self.totalks[n],
+                )
+                params.append(p.data)
+                grads.append(grad)
+        return params, grads
+
+    def warmup_compiled_eval_model(self) -> None:
+        """Trigger compilation of the eval forward with one dummy batch."""
+        tplr.logger.info("Compiling eval model forward...")
+        start = tplr.T()
+        input_ids = torch.zeros(
+            (self.hparams.batch_size, self.hparams.sequence_length),
+            dtype=torch.long,
+            device=self.config.device,
+        )
+        with torch.inference_mode():
+            self.eval_model.eval()
+            self.eval_model(input_ids=input_ids, labels=input_ids)
+        tplr.logger.info(f"Eval model compiled in {tplr.T() - start:.2f}s")
+
+    def stage_eval_batches(
+        self, batches: list, indices: list[int]
+    ) -> list[tuple[torch.Tensor, torch.Tensor]]:
+        """Move the sampled eval batches to the device once, with labels.
+
+        The before/after loss loops then reuse the same device tensors
+        instead of re-copying and re-masking every batch for each pass.
+        """
+        pin = str(self.config.device).startswith("cuda")
+        staged = []
+        for i in indices:
+            input_ids = torch.as_tensor(batches[i], dtype=torch.long)
+            if pin:
+                input_ids = input_ids.pin_memory()
+            input_ids = input_ids.to(self.config.device, non_blocking=True)
+            labels = torch.where(
+                input_ids == self.tokenizer.pad_token_id, -100, input_ids
+            )
+            staged.append((input_ids, labels))
+        return staged
+
+    def update_weights(self) -> None:
+        """Min-power normalise the positive scores of evaluated UIDs into weights.
+
+        Works on the full score vector with the non-positive and unevaluated
+        entries masked to zero, which matches normalising only the positive
+        subset without gathering it out and scattering it back.
+        """
+        evaluated_mask = torch.zeros_like(
+            self.final_moving_avg_scores, dtype=torch.bool
+        )
+        evaluated_mask[list(self.evaluated_uids)] = True
+        positive_mask = (self.final_moving_avg_scores > 0) & evaluated_mask
+        if not positive_mask.any():
+            self.weights = torch.zeros_like(self.final_moving_avg_scores)
+            tplr.logger.info("No positive scores found, all weights set to 0")
+            return
+
+        self.weights = min_power_normalization(
+            self.final_moving_avg_scores.masked_fill(~positive_mask, 0.0),
+            power=self.hparams.power_normalisation,
+        )
+
+        # Log warning if weights don't sum to 1
+        weight_sum = self.weights.sum().item()
+        tplr.logger.debug(f"Weight sum: {weight_sum}")
+        if abs(weight_sum - 1.0) > 1e-6:
+            tplr.logger.warning(f"Weights sum to {weight_sum}, expected close to 1.0")
+
     def reset_peer(self, inactive_since: int, uid: int) -> bool:
         if self.current_window - inactive_since > self.hparams.reset_inactivity_windows:
             self.final_score_history[uid] = []
@@ -340,11 +518,14 @@ class Validator:
         )
 
     async def run(self):
-        # Start background block listener
+        # Start background block listener. It stays a daemon thread rather
+        # than a task on the loop: the eval passes hold the loop for long
+        # synchronous spans that would starve a websocket reader.
         self.loop = asyncio.get_running_loop()
         self.listener = threading.Thread(
             target=self.block_listener, args=(self.loop,), daemon=True
-        ).start()
+        )
+        self.listener.start()
 
         # Use config peers if provided
         if self.config.peers:
@@ -421,10 +602,7 @@ class Validator:
 
         else:
             tplr.logger.info("Starting from scratch")
-            self.momentum = {
-                n: torch.zeros_like(p) for n, p in self.model.named_parameters()
-            }
-            self.model.to(self.config.device)
+            self.momentum = {}
 
         self.comms.start_commitment_fetcher()
         self.comms.start_background_tasks()
@@ -525,6 +703,7 @@ class Validator:
                     )
 
             # Apply penalties to all inactive peers
+            penalized_uids = []
             for uid, (inactive_since, _) in list(self.inactive_scores.items()):
                 # If peer became active again, remove from inactive tracking
                 if uid in self.eval_peers.keys():
@@ -536,47 +715,53 @@ class Validator:
                 if peer_reset:
                     continue
 
-                # Apply flat 25% penalty instead of exponential decay
-                old_score = self.final_moving_avg_scores[uid].item()
-                new_score = old_score  # Initialize new_score with old_score value
-                if self.final_moving_avg_scores[uid] > 0:
-                    self.final_moving_avg_scores[uid] *= (
-                        0.75  # Apply flat 25% reduction for positive scores only
-                    )
+                penalized_uids.append(uid)
 
-                    self.final_score_history[uid] = [
-                        final_score * 0.75 if final_score > 0 else final_score
-                        for final_score in self.final_score_history[uid]
-                    ]
-                    new_score = self.final_moving_avg_scores[uid].item()
+            if penalized_uids:
+                # Apply flat 25% penalty instead of exponential decay, to
+                # positive scores only, for all remaining inactive peers at once
+                penalized = torch.tensor(penalized_uids, dtype=torch.long)
+                old_scores = self.final_moving_avg_scores[penalized]
+                new_scores = torch.where(old_scores > 0, old_scores * 0.75, old_scores)
+                self.final_moving_avg_scores[penalized] = new_scores
 
-                    tplr.logger.info(
-                        f"UID {uid} penalized for inactivity: "
-                        f"{old_score:.4f} -> {new_score:.4f}"
+                inactivity_metrics = {}
+                for uid, old_score, new_score in zip(
+                    penalized_uids, old_scores.tolist(), new_scores.tolist()
+                ):
+                    if old_score > 0:
+                        self.final_score_history[uid] = [
+                            final_score * 0.75 if final_score > 0 else final_score
+                            for final_score in self.final_score_history[uid]
+                        ]
+                        tplr.logger.info(
+                            f"UID {uid} penalized for inactivity: "
+                            f"{old_score:.4f} -> {new_score:.4f}"
+                        )
+
+                    inactivity_metrics[f"validator/inactivity/{uid}/score_before"] = (
+                        old_score
+                    )
+                    inactivity_metrics[f"validator/inactivity/{uid}/score_after"] = (
+                        new_score
                     )
 
-                # Log slash metrics to WandB
-                self.wandb.log(
-                    {
-                        f"validator/inactivity/{uid}/score_before": old_score,
-                        f"validator/inactivity/{uid}/score_after": new_score,
-                    },
-                    step=self.global_step,
-                )
+                    # Log slash metrics to InfluxDB with primitive types
+                    self.metrics_logger.log(
+                        measurement="validator_inactivity",
+                        tags={
+                            "uid": str(uid),
+                            "window": int(current_window),
+                            "global_step": int(self.global_step),
+                        },
+                        fields={
+                            "score_before": float(old_score),
+                            "score_after": float(new_score),
+                        },
+                    )
 
-                # Log slash metrics to InfluxDB with primitive types
-                self.metrics_logger.log(
-                    measurement="validator_inactivity",
-                    tags={
-                        "uid": str(uid),
-                        "window": int(current_window),
-                        "global_step": int(self.global_step),
-                    },
-                    fields={
-                        "score_before": float(old_score),
-                        "score_after": float(new_score),
-                    },
-                )
+                # Log slash metrics to WandB
+                self.wandb.log(inactivity_metrics, step=self.global_step)
 
             # Calculate time window for this sync window
 
@@ -587,8 +772,12 @@ class Validator:
             max_delay = 60
             while True:
                 try:
-                    response = self.subtensor.query_module(
-                        "Timestamp", "Now", block=sync_block
+                    # The substrate query is blocking, so keep it off the event loop
+                    response = await asyncio.to_thread(
+                        self.subtensor.query_module,
+                        "Timestamp",
+                        "Now",
+                        block=sync_block,
                     )
                     ts_value = response.value / 1000  # convert ms to seconds
                     break
@@ -758,18 +947,32 @@ class Validator:
 
             tplr.logger.info(f"Evaluating random subset of peers: {evaluation_uids}")
 
-            for eval_uid in evaluation_uids:
+            # Fetch every evaluated peer's gradient concurrently so the bucket
+            # round trips overlap; a failed fetch is treated as missing.
+            eval_results = await asyncio.gather(
+                *[
+                    self.comms.get(
+                        uid=str(eval_uid),
+                        window=self.sync_window,
+                        key="gradient",
+                        local=False,
+                        stale_retention=10,
+                        time_max=time_max,
+                        time_min=time_min,
+                    )
+                    for eval_uid in evaluation_uids
+                ],
+                return_exceptions=True,
+            )
+
+            for eval_uid, eval_result in zip(evaluation_uids, eval_results):
                 tplr.logger.info(f"Evaluating uid: {eval_uid}")
 
-                eval_result = await self.comms.get(
-                    uid=str(eval_uid),
-                    window=self.sync_window,
-                    key="gradient",
-                    local=False,
-                    stale_retention=10,
-                    time_max=time_max,
-                    time_min=time_min,
-                )
+                if isinstance(eval_result, BaseException):
+                    tplr.logger.warning(
+                        f"Failed to fetch gradient from UID {eval_uid}: {eval_result}"
+                    )
+                    eval_result = None
 
                 scoring_start = tplr.T()
                 if (
@@ -846,216 +1049,215 @@ class Validator:
                     )
 
                     state_dict, _ = eval_result
-                    model_own_data_eval = copy.deepcopy(self.model)
-
-                    # 9. Compute loss before applying gradient
-                    self.optimizer.zero_grad()
-                    model_own_data_eval.zero_grad()
-                    loss_before_own = 0.0
-                    n_batches = 0
-
-                    with torch.no_grad():
-                        model_own_data_eval.eval()
-                        batches_own = []
-                        for batch in loader_own:
-                            batches_own.append(batch)
-
-                        total_batches_own = len(batches_own)
-                        sample_size_own = max(
-                            1,
-                            int(total_batches_own * self.hparams.validator_sample_rate),
-                        )
-                        sampled_indices_own = random.sample(
-                            range(total_batches_own), sample_size_own
-                        )
-                        sampled_indices_own = sorted(
-                            sampled_indices_own
-                        )  # Sort for sequential access
-
-                        tplr.logger.info(
-                            f"Evaluating {sample_size_own}/{total_batches_own} batches ({self.hparams.validator_sample_rate * 100:.1f}%)"
-                        )
-
-                        for i, batch in enumerate(batches_own):
-                            if i not in sampled_indices_own:
-                                continue
-                            input_ids = torch.tensor(batch, dtype=torch.long).to(
-                                model_own_data_eval.device
-                            )
-                            labels = input_ids.clone()
-                            labels = torch.where(
-                                labels == self.tokenizer.pad_token_id, -100, labels
-                            )
-                            outputs = model_own_data_eval(
-                                input_ids=input_ids, labels=labels
-                            )
-                            loss_before_own += outputs.loss.item()
-                            n_batches += 1
-                            del input_ids, labels, outputs
-                            torch.cuda.empty_cache()
+                    with self.eval_scratch():
+                        model_own_data_eval = self.reset_eval_model()
 
-                    self.loss_before_per_batch_own = (
-                        loss_before_own / n_batches if n_batches > 0 else 0
-                    )
-                    tplr.logger.debug(
-                        f"Loss before (own data): {self.loss_before_per_batch_own}"
-                    )
-
-                    # 9. Apply gradient and compute loss after
-                    try:
+                        # 9. Compute loss before applying gradient
                         self.optimizer.zero_grad()
                         model_own_data_eval.zero_grad()
+                        n_batches = 0
+
+                        with torch.inference_mode():
+                            model_own_data_eval.eval()
+                            batches_own = []
+                            for batch in loader_own:
+                                batches_own.append(batch)
+
+                            total_batches_own = len(batches_own)
+                            sample_size_own = max(
+                                1,
+                                int(
+                                    total_batches_own
+                                    * self.hparams.validator_sample_rate
+                                ),
+                            )
+                            sampled_indices_own = random.sample(
+                                range(total_batches_own), sample_size_own
+                            )
+                            sampled_indices_own = sorted(
+                                sampled_indices_own
+                            )  # Sort for sequential access
 
-                        # First validate all gradients before applying any
-                        for n, p in model_own_data_eval.named_parameters():
-                            idxs_key = n + "idxs"
-                            vals_key = n + "vals"
-                            idxs = state_dict.get(idxs_key, None)
-                            vals = state_dict.get(vals_key, None)
-
-                            if idxs is not None and vals is not None:
-                                # Move tensors to device
-                                idxs = idxs.to(self.config.device)
-                                vals = vals.to(self.config.device)
-
-                                # Validate indices are within bounds
-                                if self.totalks.get(n) is None:
-                                    tplr.logger.warning(
-                                        f"Missing totalk for parameter {n}, skipping peer {eval_uid}"
-                                    )
-                                    raise ValueError(
-                                        f"Invalid gradient data from peer {eval_uid}: Missing totalk for parameter {n}"
-                                    )
+                            tplr.logger.info(
+                                f"Evaluating {sample_size_own}/{total_batches_own} batches ({self.hparams.validator_sample_rate * 100:.1f}%)"
+                            )
 
-                                # Check compressed indices are valid
-                                self.comms.check_compressed_indices(
-                                    idxs_key,
-                                    idxs,
-                                    self.totalks[n],
-                                    allowed_topk=self.hparams.topk_compression,
+                            staged_own = self.stage_eval_batches(
+                                batches_own, sampled_indices_own
+                            )
+                            loss_sum = torch.zeros((), device=self.config.device)
+                            for input_ids, labels in staged_own:
+                                outputs = model_own_data_eval(
+                                    input_ids=input_ids, labels=labels
                                 )
+                                loss_sum += outputs.loss.detach()
+                                n_batches += 1
+                                del outputs
+                            loss_before_own = loss_sum.item()
 
-                                # Check for NaN or Inf values
-                                if torch.isnan(vals).any() or torch.isinf(vals).any():
-                                    tplr.logger.warning(
-                                        f"Values contain NaN or Inf for parameter {vals_key}, skipping peer {eval_uid}"
-                                    )
-                                    raise ValueError(
-                                        f"Invalid gradient data from peer {eval_uid}: NaN or Inf values in {vals_key}"
-                                    )
-
-                        # If all validations pass, apply the gradients
-                        for n, p in model_own_data_eval.named_parameters():
-                            idxs_key = n + "idxs"
-                            vals_key = n + "vals"
-                            idxs = state_dict.get(idxs_key, None)
-                            vals = state_dict.get(vals_key, None)
+                        self.loss_before_per_batch_own = (
+                            loss_before_own / n_batches if n_batches > 0 else 0
+                        )
+                        tplr.logger.debug(
+                            f"Loss before (own data): {self.loss_before_per_batch_own}"
+                        )
 
-                            if idxs is not None and vals is not None:
-                                idxs = idxs.to(self.config.device)
-                                vals = vals.to(self.config.device)
+                        # 9. Apply gradient and compute loss after
+                        try:
+                            self.optimizer.zero_grad()
+                            model_own_data_eval.zero_grad()
+
+                            # First validate all gradients before applying any
+                            for (n, idxs_key, vals_key), p in zip(
+                                self.param_keys, model_own_data_eval.parameters()
+                            ):
+                                idxs = state_dict.get(idxs_key, None)
+                                vals = state_dict.get(vals_key, None)
+
+                                if idxs is not None and vals is not None:
+                                    # Move tensors to device
+                                    idxs = idxs.to(self.config.device)
+                                    vals = vals.to(self.config.device)
+
+                                    # Validate indices are within bounds
+                                    if self.totalks.get(n) is None:
+                                        tplr.logger.warning(
+                                            f"Missing totalk for parameter {n}, skipping peer {eval_uid}"
+                                        )
+                                        raise ValueError(
+                                            f"Invalid gradient data from peer {eval_uid}: Missing totalk for parameter {n}"
+                                        )
+
+                                    # Check compressed indices are valid
+                                    self.comms.check_compressed_indices(
+                                        idxs_key,
+                                        idxs,
+                                        self.totalks[n],
+                                        allowed_topk=self.hparams.topk_compression,
+                                    )
 
-                                grad = self.transformer.decode(
-                                    self.compressor.decompress(
-                                        p.to(self.config.device),
+                                    # Check for NaN or Inf values
+                                    if (
+                                        torch.isnan(vals).any()
+                                        or torch.isinf(vals).any()
+                                    ):
+                                        tplr.logger.warning(
+                                            f"Values contain NaN or Inf for parameter {vals_key}, skipping peer {eval_uid}"
+                                        )
+                                        raise ValueError(
+                                            f"Invalid gradient data from peer {eval_uid}: NaN or Inf values in {vals_key}"
+                                        )
+
+                            # If all validations pass, apply the gradients
+                            params, grads = [], []
+                            for (n, idxs_key, vals_key), p in zip(
+                                self.param_keys, model_own_data_eval.parameters()
+                            ):
+                                idxs = state_dict.get(idxs_key, None)
+                                vals = state_dict.get(vals_key, None)
+
+                                if idxs is not None and vals is not None:
+                                    idxs = idxs.to(self.config.device)
+                                    vals = vals.to(self.config.device)
+
+                                    grad = self.recompose(
+                                        p,
                                         idxs,
                                         vals,
                                         self.xshapes[n],
                                         self.totalks[n],
                                     )
-                                ).to(self.config.device)
-
-                                # Final safety check on the gradient itself
-                                if torch.isnan(grad).any() or torch.isinf(grad).any():
-                                    tplr.logger.warning(
-                                        f"Decompressed gradient for {n} contains NaN/Inf, skipping peer {eval_uid}"
-                                    )
-                                    raise ValueError(
-                                        f"Invalid gradient from peer {eval_uid}: NaN or Inf in decompressed gradient for {n}"
-                                    )
 
-                                p.data.sub_(
-                                    grad.sign(), alpha=self.scheduler.get_last_lr()[0]
+                                    # Final safety check on the gradient itself
+                                    if (
+                                        torch.isnan(grad).any()
+                                        or torch.isinf(grad).any()
+                                    ):
+                                        tplr.logger.warning(
+                                            f"Decompressed gradient for {n} contains NaN/Inf, skipping peer {eval_uid}"
+                                        )
+                                        raise ValueError(
+                                            f"Invalid gradient from peer {eval_uid}: NaN or Inf in decompressed gradient for {n}"
+                                        )
+
+                                    params.append(p.data)
+                                    grads.append(grad)
+                            if grads:
+                                torch._foreach_sign_(grads)
+                                torch._foreach_sub_(
+                                    params, grads, alpha=self.scheduler.get_last_lr()[0]
+                                )
+                        except Exception as e:
+                            old_score = self.final_moving_avg_scores[eval_uid].item()
+
+                            if old_score > 0:
+                                # Reset positive scores to zero explicitly
+                                self.final_moving_avg_scores[eval_uid] = 0.0
+                                self.final_score_history[eval_uid] = []
+                                tplr.logger.warning(
+                                    f"Set positive score of UID {eval_uid} from {old_score:.4f} to 0.0 - invalid gradient data"
+                                )
+                            else:
+                                # Negative score is worse than zero; keep it as-is.
+                                tplr.logger.warning(
+                                    f"UID {eval_uid} had negative score {old_score:.4f}; retaining due to invalid gradient data"
                                 )
-                    except Exception as e:
-                        old_score = self.final_moving_avg_scores[eval_uid].item()
 
-                        if old_score > 0:
-                            # Reset positive scores to zero explicitly
-                            self.final_moving_avg_scores[eval_uid] = 0.0
-                            self.final_score_history[eval_uid] = []
-                            tplr.logger.warning(
-                                f"Set positive score of UID {eval_uid} from {old_score:.4f} to 0.0 - invalid gradient data"
-                            )
-                        else:
-                            # Negative score is worse than zero; keep it as-is.
-                            tplr.logger.warning(
-                                f"UID {eval_uid} had negative score {old_score:.4f}; retaining due to invalid gradient data"
+                            # Include in evaluated UIDs so it gets logged in metrics
+                            self.evaluated_uids.add(eval_uid)
+
+                            # Log to WandB
+                            self.wandb.log(
+                                {
+                                    f"validator/slash/{eval_uid}/score_before": old_score,
+                                    f"validator/slash/{eval_uid}/score_after": self.final_moving_avg_scores[
+                                        eval_uid
+                                    ].item(),
+                                    f"validator/slash/{eval_uid}/reason": str(e),
+                                },
+                                step=self.global_step,
                             )
 
-                        # Include in evaluated UIDs so it gets logged in metrics
-                        self.evaluated_uids.add(eval_uid)
-
-                        # Log to WandB
-                        self.wandb.log(
-                            {
-                                f"validator/slash/{eval_uid}/score_before": old_score,
-                                f"validator/slash/{eval_uid}/score_after": self.final_moving_avg_scores[
-                                    eval_uid
-                                ].item(),
-                                f"validator/slash/{eval_uid}/reason": str(e),
-                            },
-                            step=self.global_step,
-                        )
-
-                        # Log to InfluxDB metrics with primitive types
-                        self.metrics_logger.log(
-                            measurement="validator_slash",
-                            tags={
-                                "eval_uid": str(eval_uid),
-                                "window": int(self.sync_window),
-                                "global_step": int(self.global_step),
-                                "reason_code": "invalid_gradient",
-                            },
-                            fields={
-                                "score_before": float(old_score),
-                                "score_after": float(
-                                    self.final_moving_avg_scores[eval_uid].item()
-                                ),
-                                "reason": str(e)[:255],  # Truncate long error messages
-                            },
-                        )
+                            # Log to InfluxDB metrics with primitive types
+                            self.metrics_logger.log(
+                                measurement="validator_slash",
+                                tags={
+                                    "eval_uid": str(eval_uid),
+                                    "window": int(self.sync_window),
+                                    "global_step": int(self.global_step),
+                                    "reason_code": "invalid_gradient",
+                                },
+                                fields={
+                                    "score_before": float(old_score),
+                                    "score_after": float(
+                                        self.final_moving_avg_scores[eval_uid].item()
+                                    ),
+                                    # Truncate long error messages
+                                    "reason": str(e)[:255],
+                                },
+                            )
 
-                        # Skip the rest of processing for this peer
-                        continue
+                            # Skip the rest of processing for this peer
+                            continue
 
-                    # 10. Compute loss after gradient application
-                    self.optimizer.zero_grad()
-                    model_own_data_eval.zero_grad()
-                    loss_after_own = 0.0
-                    n_batches = 0
-                    with torch.no_grad():
-                        model_own_data_eval.eval()
-                        for i, batch in enumerate(batches_own):
-                            if i not in sampled_indices_own:
-                                continue
-                            input_ids = torch.tensor(batch, dtype=torch.long).to(
-                                model_own_data_eval.device
-                            )
-                            labels = input_ids.clone()
-                            labels = torch.where(
-                                labels == self.tokenizer.pad_token_id, -100, labels
-                            )
-                            outputs = model_own_data_eval(
-                                input_ids=input_ids, labels=labels
-                            )
-                            loss_after_own += outputs.loss.item()
-                            n_batches += 1
-                            del input_ids, labels, outputs
-                            torch.cuda.empty_cache()
+                        # 10. Compute loss after gradient application
+                        self.optimizer.zero_grad()
+                        model_own_data_eval.zero_grad()
+                        n_batches = 0
+                        with torch.inference_mode():
+                            model_own_data_eval.eval()
+                            loss_sum = torch.zeros((), device=self.config.device)
+                            for input_ids, labels in staged_own:
+                                outputs = model_own_data_eval(
+                                    input_ids=input_ids, labels=labels
+                                )
+                                loss_sum += outputs.loss.detach()
+                                n_batches += 1
+                                del outputs
+                            loss_after_own = loss_sum.item()
 
                     # Clean up stored batches
-                    del batches_own, local_pages, loader_own, model_own_data_eval
+                    del batches_own, staged_own, local_pages, loader_own
                     torch.cuda.empty_cache()
 
                     self.loss_after_per_batch_own = (
@@ -1084,7 +1286,6 @@ class Validator:
                     )
 
                     # 7. Load evaluation data from random page
-                    model_random_data_eval = copy.deepcopy(self.model)
                     data_start = tplr.T()
                     pages_random = await retry_call(
                         tplr.r2_dataset.R2DatasetLoader.next_pages,
@@ -1123,126 +1324,114 @@ class Validator:
                     )
                     state_dict, _ = eval_result
 
-                    # 8. Compute initial loss
-                    self.optimizer.zero_grad()
-                    model_random_data_eval.zero_grad()
-                    loss_before_random = 0.0
-                    n_batches = 0
-
-                    with torch.no_grad():
-                        model_random_data_eval.eval()
-                        # Sample random batches from the loader
-                        batches_random = []
-                        for batch in loader_random:
-                            batches_random.append(batch)
-
-                        total_batches_random = len(batches_random)
-                        sample_size_random = max(
-                            1,
-                            int(
-                                total_batches_random
-                                * self.hparams.validator_sample_rate
-                            ),
-                        )
-                        sampled_indices_random = random.sample(
-                            range(total_batches_random), sample_size_random
-                        )
-                        sampled_indices_random = sorted(
-                            sampled_indices_random
-                        )  # Sort for sequential access
+                    with self.eval_scratch():
+                        model_random_data_eval = self.reset_eval_model()
 
-                        tplr.logger.info(
-                            f"Evaluating {sample_size_random}/{total_batches_random} batches ({self.hparams.validator_sample_rate * 100:.1f}%)"
-                        )
-
-                        for idx in sampled_indices_random:
-                            batch = batches_random[idx]
-                            input_ids = torch.tensor(batch, dtype=torch.long).to(
-                                model_random_data_eval.device
-                            )
-                            labels = input_ids.clone()
-                            labels = torch.where(
-                                labels == self.tokenizer.pad_token_id, -100, labels
+                        # Start decoding the peer gradient now so it overlaps
+                        # with the loss-before forward passes below
+                        decode_error = None
+                        try:
+                            params, grads = self.decode_eval_gradient(
+                                model_random_data_eval, state_dict
                             )
-                            outputs = model_random_data_eval(
-                                input_ids=input_ids, labels=labels
-                            )
-                            loss_before_random += outputs.loss.item()
-                            n_batches += 1
-                            del input_ids, labels, outputs
-                            torch.cuda.empty_cache()
+                        except Exception as e:
+                            decode_error = e
 
-                    self.loss_before_per_batch_random = (
-                        loss_before_random / n_batches if n_batches > 0 else 0
-                    )
-                    tplr.logger.debug(
-                        f"Loss before (random data): {self.loss_before_per_batch_random}"
-                    )
-                    # 9. Apply gradient and compute loss after
-                    try:
+                        # 8. Compute initial loss
                         self.optimizer.zero_grad()
                         model_random_data_eval.zero_grad()
+                        n_batches = 0
+
+                        with torch.inference_mode():
+                            model_random_data_eval.eval()
+                            # Sample random batches from the loader
+                            batches_random = []
+                            for batch in loader_random:
+                                batches_random.append(batch)
+
+                            total_batches_random = len(batches_random)
+                            sample_size_random = max(
+                                1,
+                                int(
+                                    total_batches_random
+                                    * self.hparams.validator_sample_rate
+                                ),
+                            )
+                            sampled_indices_random = random.sample(
+                                range(total_batches_random), sample_size_random
+                            )
+                            sampled_indices_random = sorted(
+                                sampled_indices_random
+                            )  # Sort for sequential access
 
-                        for n, p in model_random_data_eval.named_parameters():
-                            idxs_key = n + "idxs"
-                            vals_key = n + "vals"
-                            idxs = state_dict.get(idxs_key, None)
-                            vals = state_dict.get(vals_key, None)
-
-                            if idxs is not None and vals is not None:
-                                idxs = idxs.to(self.config.device)
-                                vals = vals.to(self.config.device)
-
-                                grad = self.transformer.decode(
-                                    self.compressor.decompress(
-                                        p.to(self.config.device),
-                                        idxs,
-                                        vals,
-                                        self.xshapes[n],
-                                        self.totalks[n],
-                                    )
-                                ).to(self.config.device)
+                            tplr.logger.info(
+                                f"Evaluating {sample_size_random}/{total_batches_random} batches ({self.hparams.validator_sample_rate * 100:.1f}%)"
+                            )
 
-                                p.data.sub_(
-                                    grad.sign(), alpha=self.scheduler.get_last_lr()[0]
+                            staged_random = self.stage_eval_batches(
+                                batches_random, sampled_indices_random
+                            )
+                            loss_sum = torch.zeros((), device=self.config.device)
+                            for input_ids, labels in staged_random:
+                                outputs = model_random_data_eval(
+                                    input_ids=input_ids, labels=labels
                                 )
-                    except Exception as e:
-                        tplr.logger.error(
-                            f"Failed to apply gradient for UID {eval_uid}: {str(e)}"
-                        )
-                        continue
+                                loss_sum += outputs.loss.detach()
+                                n_batches += 1
+                                del outputs
+                            loss_before_random = loss_sum.item()
 
-                    # 10. Compute loss after gradient application for random data
-                    self.optimizer.zero_grad()
-                    model_random_data_eval.zero_grad()
-                    loss_after_random = 0.0
-                    n_batches = 0
-                    with torch.no_grad():
-                        model_random_data_eval.eval()
-                        for i, batch in enumerate(batches_random):
-                            if i not in sampled_indices_random:
-                                continue
-                            input_ids = torch.tensor(batch, dtype=torch.long).to(
-                                model_random_data_eval.device
-                            )
-                            labels = input_ids.clone()
-                            labels = torch.where(
-                                labels == self.tokenizer.pad_token_id, -100, labels
-                            )
-                            outputs = model_random_data_eval(
-                                input_ids=input_ids, labels=labels
+                        self.loss_before_per_batch_random = (
+                            loss_before_random / n_batches if n_batches > 0 else 0
+                        )
+                        tplr.logger.debug(
+                            f"Loss before (random data): {self.loss_before_per_batch_random}"
+                        )
+                        # 9. Apply gradient and compute loss after
+                        try:
+                            self.optimizer.zero_grad()
+                            model_random_data_eval.zero_grad()
+
+                            if decode_error is not None:
+                                raise decode_error
+                            if self.decode_stream is not None:
+                                current_stream = torch.cuda.current_stream()
+                                current_stream.wait_stream(self.decode_stream)
+                                for grad in grads:
+                                    grad.record_stream(current_stream)
+                            if grads:
+                                torch._foreach_sign_(grads)
+                                torch._foreach_sub_(
+                                    params, grads, alpha=self.scheduler.get_last_lr()[0]
+                                )
+                        except Exception as e:
+                            tplr.logger.error(
+                                f"Failed to apply gradient for UID {eval_uid}: {str(e)}"
                             )
-                            loss_after_random += outputs.loss.item()
-                            n_batches += 1
-                            del input_ids, labels, outputs
-                            torch.cuda.empty_cache()
+                            continue
+
+                        # 10. Compute loss after gradient application for random data
+                        self.optimizer.zero_grad()
+                        model_random_data_eval.zero_grad()
+                        n_batches = 0
+                        with torch.inference_mode():
+                            model_random_data_eval.eval()
+                            loss_sum = torch.zeros((), device=self.config.device)
+                            for input_ids, labels in staged_random:
+                                outputs = model_random_data_eval(
+                                    input_ids=input_ids, labels=labels
+                                )
+                                loss_sum += outputs.loss.detach()
+                                n_batches += 1
+                                del outputs
+                            loss_after_random = loss_sum.item()
 
                     # Clean up stored batches, loader & pages
                     del (
                         batches_random,
+                        staged_random,
                         pages_random,
                         loader_random,
-                        model_random_data_eval,
                     )
                     torch.cuda.empty_cache()
 
@@ -1372,27 +1561,7 @@ class Validator:
                     self.evaluated_uids.add(eval_uid)
 
                     # 12. Calculate weights using min power norm
-                    self.weights = torch.zeros_like(self.final_moving_avg_scores)
-                    evaluated_mask = torch.zeros_like(
-                        self.final_moving_avg_scores, dtype=torch.bool
-                    )
-                    evaluated_mask[list(self.evaluated_uids)] = True
-                    positive_mask = (self.final_moving_avg_scores > 0) & evaluated_mask
-                    if positive_mask.any():
-                        self.weights[positive_mask] = min_power_normalization(
-                            self.final_moving_avg_scores[positive_mask],
-                            power=self.hparams.power_normalisation,
-                        )
-                        weight_sum = self.weights.sum().item()
-                        tplr.logger.debug(f"Weight sum: {weight_sum}")
-                        if abs(weight_sum - 1.0) > 1e-6:
-                            tplr.logger.warning(
-                                f"Weights sum to {weight_sum}, expected close to 1.0"
-                            )
-                    else:
-                        tplr.logger.info(
-                            "No positive scores found, all weights set to 0"
-                        )
+                    self.update_weights()
 
                     tplr.logger.info(
                         f"{tplr.P(self.sync_window, tplr.T() - eval_start)} Completed evaluation"
@@ -1427,32 +1596,7 @@ class Validator:
                     self.evaluated_uids.add(eval_uid)
 
                     # Recalculate weights
-                    self.weights = torch.zeros_like(self.final_moving_avg_scores)
-                    evaluated_mask = torch.zeros_like(
-                        self.final_moving_avg_scores, dtype=torch.bool
-                    )
-                    evaluated_mask[list(self.evaluated_uids)] = True
-
-                    positive_mask = (self.final_moving_avg_scores > 0) & evaluated_mask
-
-                    if positive_mask.any():
-                        # Apply normalization to all positive scores at once
-                        self.weights[positive_mask] = min_power_normalization(
-                            self.final_moving_avg_scores[positive_mask],
-                            power=self.hparams.power_normalisation,
-                        )
-
-                        # Log warning if weights don't sum to 1
-                        weight_sum = self.weights.sum().item()
-                        tplr.logger.debug(f"Weight sum: {weight_sum}")
-                        if abs(weight_sum - 1.0) > 1e-6:
-                            tplr.logger.warning(
-                                f"Weights sum to {weight_sum}, expected close to 1.0"
-                            )
-                    else:
-                        tplr.logger.info(
-                            "No positive scores found, all weights set to 0"
-                        )
+                    self.update_weights()
 
                     # Log updated scores
                     tplr.logger.info(
@@ -1485,83 +1629,57 @@ class Validator:
                     f"{tplr.P(self.sync_window, tplr.T() - eval_start)} Completed evaluation"
                 )
 
-            # Log scores and metrics for evaluated UIDs as a table
-            headers = [
-                "UID",
-                "Last Score",
-                "Binary Indicator",
-                "Binary Moving Avg",
-                "Norm Binary Score",
-                "Final Moving Avg",
-                "Sync score",
-                "Weight",
-            ]
-            table = [headers]
-            for uid in sorted(self.evaluated_uids):
-                row = [
-                    str(uid),
-                    f"{self.gradient_scores[uid]:.4f}",
-                    f"{self.binary_indicator_scores[uid]:.4f}",
-                    f"{self.binary_moving_averages[uid]:.4f}",
-                    f"{self.normalised_binary_moving_averages[uid]:.4f}",
-                    f"{self.final_moving_avg_scores[uid]:.4f}",
-                    f"{self.sync_scores[uid]:.4f}",
-                    f"{self.weights[uid]:.4f}",
-                ]
-                table.append(row)
+            # Drop the eval scratch pool wholesale now that its tensors are gone
+            if self.eval_pool is not None:
+                self.eval_pool = torch.cuda.MemPool()
 
-            try:
-                try:
-                    width = os.get_terminal_size().columns
-                except Exception:
-                    width = 0
-                os.environ["COLUMNS"] = str(max(200, width))
-
-                rich_table = Table(title="Updated scores for evaluated UIDs")
-                for header in headers:
-                    rich_table.add_column(header)
-                for row in table[1:]:
-                    rich_table.add_row(*row)
-                sio = StringIO()
-                console = Console(file=sio, width=int(os.environ["COLUMNS"]))
-                console.print(rich_table)
-                table_str = sio.getvalue()
-            except ImportError:
-                tplr.logger.warning(
-                    "rich module not found; falling back to basic formatting."
-                )
-                col_widths = [
-                    max(len(row[i]) for row in table) for i in range(len(headers))
+            # Log scores and metrics for evaluated UIDs as a table. Rendering
+            # runs in a worker thread so it stays off the window loop.
+            if tplr.logger.isEnabledFor(logging.INFO):
+                table = [
+                    [
+                        str(uid),
+                        f"{self.gradient_scores[uid]:.4f}",
+                        f"{self.binary_indicator_scores[uid]:.4f}",
+                        f"{self.binary_moving_averages[uid]:.4f}",
+                        f"{self.normalised_binary_moving_averages[uid]:.4f}",
+                        f"{self.final_moving_avg_scores[uid]:.4f}",
+                        f"{self.sync_scores[uid]:.4f}",
+                        f"{self.weights[uid]:.4f}",
+                    ]
+                    for uid in sorted(self.evaluated_uids)
                 ]
-                lines = []
-                for i, row in enumerate(table):
-                    line = " | ".join(
-                        row[j].ljust(col_widths[j]) for j in range(len(row))
-                    )
-                    lines.append(line)
-                    if i == 0:
-                        separator = "-+-".join(
-                            "-" * col_widths[j] for j in range(len(headers))
-                        )
-                        lines.append(separator)
-                table_str = "\n".join(lines)
-
-            tplr.logger.info("Updated scores for evaluated UIDs:\n" + table_str)
-
-            # Log WandB metrics per UID
-            for uid in sorted(self.evaluated_uids):
-                # Extract primitive values from tensors for WandB
-                gradient_score = float(self.gradient_scores[uid].item())
-                binary_indicator = float(self.binary_indicator_scores[uid].item())
-                binary_moving_avg = float(self.binary_moving_averages[uid].item())
-                normalised_binary = float(
-                    self.normalised_binary_moving_averages[uid].item()
+                # Keep a handle so the render can't be collected mid-flight,
+                # and surface any failure from the previous window's render
+                if self.score_table_task is not None:
+                    try:
+                        await self.score_table_task
+                    except Exception as e:
+                        tplr.logger.warning(f"Failed to log score table: {e}")
+                self.score_table_task = asyncio.create_task(
+                    asyncio.to_thread(log_score_table, table, self.config.debug)
                 )
-                sync_score = float(self.sync_scores[uid].item())
-                final_moving_avg = float(self.final_moving_avg_scores[uid].item())
-                weight = float(self.weights[uid].item())
 
-                self.wandb.log(
+            # Log WandB metrics per UID, converting each score tensor to
+            # Python floats once and sending a single payload for the window
+            gradient_scores = self.gradient_scores.tolist()
+            binary_indicators = self.binary_indicator_scores.tolist()
+            binary_moving_avgs = self.binary_moving_averages.tolist()
+            normalised_binaries = self.normalised_binary_moving_averages.tolist()
+            sync_scores = self.sync_scores.tolist()
+            final_moving_avgs = self.final_moving_avg_scores.tolist()
+            weights = self.weights.tolist()
+            uid_metrics = {}
+            for uid in sorted(self.evaluated_uids):
+                gradient_score = gradient_scores[uid]
+                binary_indicator = binary_indicators[uid]
+                binary_moving_avg = binary_moving_avgs[uid]
+                normalised_binary = normalised_binaries[uid]
+                sync_score = sync_scores[uid]
+                final_moving_avg = final_moving_avgs[uid]
+                weight = weights[uid]
+
+                uid_metrics.update(
                     {
                         f"validator/gradient_scores/{uid}": gradient_score,
                         f"validator/binary_indicators/{uid}": binary_indicator,
@@ -1570,8 +1688,7 @@ class Validator:
                         f"validator/final_moving_avg_scores/{uid}": final_moving_avg,
                         f"validator/sync_score/{uid}": sync_score,
                         f"validator/weights/{uid}": weight,
-                    },
-                    step=self.global_step,
+                    }
                 )
 
                 # Log to InfluxDB metrics per UID with primitive types
@@ -1592,6 +1709,8 @@ class Validator:
                         "weight": weight,
                     },
                 )
+            if uid_metrics:
+                self.wandb.log(uid_metrics, step=self.global_step)
 
             # 17. Set weights periodically
 
@@ -1613,8 +1732,7 @@ class Validator:
             # 14. Now, merge the gathered gradients into the model AFTER finishing evaluation
             self.model.train()
             update_start = tplr.T()
-            self.optimizer.zero_grad()
-            self.model.zero_grad()
+            self.optimizer.zero_grad(set_to_none=True)
             lr = self.scheduler.get_last_lr()[0]
             # Apply weight decay just like in the miner
             for n, p in self.model.named_parameters():
@@ -1627,7 +1745,6 @@ class Validator:
             else:
                 tplr.logger.warning("No gradients to apply.")
                 self.scheduler.step()
-                torch.cuda.empty_cache()
 
             tplr.logger.info(
                 f"{tplr.P(self.sync_window, tplr.T() - update_start)} Updated model"
@@ -1636,14 +1753,16 @@ class Validator:
             # Add debug data including successfully gathered peers
             debug_dict = {}
 
-            # Add model parameters debug info
-            for name, param in self.model.named_parameters():
-                if (
-                    param is not None and param.numel() >= 2
-                ):  # Check if tensor has at least 2 elements
-                    debug_dict[name + "_debug"] = (
-                        param.flatten()[:2].detach().cpu().tolist()
-                    )
+            # Add model parameters debug info, copied to host in a single transfer
+            debug_params = [
+                (name, param.detach().flatten()[:2])
+                for name, param in self.model.named_parameters()
+                if param.numel() >= 2  # Check if tensor has at least 2 elements
+            ]
+            if debug_params:
+                debug_values = torch.stack([v for _, v in debug_params]).tolist()
+                for (name, _), values in zip(debug_params, debug_values):
+                    debug_dict[name + "_debug"] = values
 
             # Add successful peers information
             if len(skipped_uids) > 0:
@@ -1688,6 +1807,9 @@ class Validator:
                 "validator/timing/gather": tplr.T() - gather_start,
                 "validator/timing/evaluation": tplr.T() - eval_start,
                 "validator/timing/model_update": tplr.T() - update_start,
+                "validator/gpu_memory_allocated": torch.cuda.memory_allocated()
+                / 1024**2,
+                "validator/gpu_memory_cached": torch.cuda.memory_reserved() / 1024**2,
             }
             self.wandb.log(evaluation_metrics, step=self.global_step)
 
@@ -1732,36 +1854,67 @@ class Validator:
                 tplr.logger.info(
                     f"Creating checkpoint at global_step {self.global_step}"
                 )
+                # The staging buffers are reused, so let the previous upload
+                # finish reading them before they are overwritten
+                if self.checkpoint_task is not None:
+                    if not self.checkpoint_task.done():
+                        tplr.logger.info("Waiting for previous checkpoint upload...")
+                    try:
+                        await self.checkpoint_task
+                    except Exception as e:
+                        tplr.logger.error(f"Previous checkpoint upload failed: {e}")
+                    self.checkpoint_task = None
+
+                # The model is copied into the pinned buffers on the current
+                # stream, so later in-place updates stay ordered after it. The
+                # upload task waits for the copy instead of the main loop.
                 checkpoint_data = {
-                    "model_state_dict": {
-                        k: v.cpu().clone() for k, v in self.model.state_dict().items()
-                    },
+                    "model_state_dict": self.comms.stage_tensors(
+                        "model", self.model.state_dict()
+                    ),
                     "optimizer_state_dict": {
                         k: v.cpu().clone() if torch.is_tensor(v) else v
                         for k, v in self.optimizer.state_dict().items()
                     },
                     "scheduler_state_dict": self.scheduler.state_dict(),
-                    "momentum": {
-                        n: torch.zeros_like(p) for n, p in self.model.named_parameters()
-                    },
                     "start_window": self.start_window,
                     "current_window": self.current_window,
                     "sync_window": self.sync_window,
                 }
-                asyncio.create_task(
-                    self.comms.put(
-                        state_dict=checkpoint_data,
-                        uid=str(self.uid),
-                        window=self.sync_window,
-                        key="checkpoint",
-                        global_step=self.global_step,
-                        local=False,
+                self.checkpoint_task = asyncio.create_task(
+                    self.upload_checkpoint(
+                        checkpoint_data, self.sync_window, self.global_step
                     )
                 )
 
             # 18. Increment global step
             self.global_step += 1
 
+    async def upload_checkpoint(
+        self, checkpoint_data: dict, window: int, global_step: int
+    ):
+        """Upload a staged checkpoint once its device-to-host copies land."""
+        # The checkpointed momentum is all zeros; filling model-sized host
+        # tensors is done in a worker thread while the copies complete.
+        shapes = {n: (p.shape, p.dtype) for n, p in self.model.named_parameters()}
+
+        def zero_momentum():
+            return {
+                n: torch.zeros(shape, dtype=dtype)
+                for n, (shape, dtype) in shapes.items()
+            }
+
+        checkpoint_data["momentum"] = await asyncio.to_thread(zero_momentum)
+        await self.comms.wait_for_staged_tensors()
+        await self.comms.put(
+            state_dict=checkpoint_data,
+            uid=str(self.uid),
+            window=window,
+            key="checkpoint",
+            global_step=global_step,
+            local=False,
+        )
+
     def select_initial_peers(self) -> tplr.comms.PeerArray | None:
         try:
             tplr.logger.info("Starting selection of initial gather peers")
@@ -2145,14 +2298,13 @@ class Validator:
                     if packed_tensor is None:
                         continue
 
-                    # Unpack binary tensor
+                    # Unpack on device; the packed tensor is 8x smaller to move
                     unpacked_tensor = tplr.neurons.unpack_binary_tensor(
-                        packed_tensor, param.shape
+                        packed_tensor.to(self.config.device),
+                        param.shape,
+                        dtype=param.dtype,
                     )
 
-                    # Move to appropriate device
-                    unpacked_tensor = unpacked_tensor.to(self.config.device)
-
                     # Set as gradient for optimizer
                     if param.grad is None:
                         param.grad = unpacked_tensor
@@ -2169,7 +2321,6 @@ class Validator:
                 # Update parameters with optimizer
                 self.optimizer.step()
                 self.scheduler.step()
-                torch.cuda.empty_cache()
 
                 tplr.logger.info("Successfully applied aggregation")
                 return True
@@ -2196,37 +2347,42 @@ class Validator:
             gather_result: The result object from a gather operation containing
                           compressed gradients from peers
         """
-        for n, p in self.model.named_parameters():
-            idxs_key = n + "idxs"
-            vals_key = n + "vals"
-            idxs = getattr(gather_result.state_dict, idxs_key, None)
-            vals = getattr(gather_result.state_dict, vals_key, None)
+        # comms.gather collects every key into a list of per-peer tensors
+        state_dict = vars(gather_result.state_dict)
+        grads = []
+        momentum_dst, momentum_src = [], []
+        for (n, idxs_key, vals_key), p in zip(self.param_keys, self.model.parameters()):
+            idxs = state_dict.get(idxs_key)
+            vals = state_dict.get(vals_key)
             if idxs is not None and vals is not None:
-                if not isinstance(idxs, (list, tuple)):
-                    idxs = [idxs]
-                if not isinstance(vals, (list, tuple)):
-                    vals = [vals]
-                new_grad = self.transformer.decode(
-                    self.compressor.batch_decompress(
-                        p.to(self.config.device),
-                        idxs,
-                        vals,
-                        self.xshapes[n],
-                        self.totalks[n],
-                    )
+                new_grad = self.recompose(
+                    p,
+                    torch.cat(idxs, dim=-1).to(self.config.device),
+                    torch.cat(vals, dim=-1).to(self.config.device),
+                    self.xshapes[n],
+                    self.totalks[n],
                 )
-                # Store pre-sign gradient in momentum
-                self.momentum[n] = new_grad.clone()
+                # Store pre-sign gradient in momentum, reusing its buffer
+                momentum = self.momentum.get(n)
+                if momentum is not None and momentum.shape == new_grad.shape:
+                    momentum_dst.append(momentum)
+                    momentum_src.append(new_grad)
+                else:
+                    self.momentum[n] = new_grad.clone()
                 if p.grad is None:
                     p.grad = new_grad
                 else:
                     p.grad.copy_(new_grad)
-                p.grad.sign_()
+                grads.append(p.grad)
             else:
                 tplr.logger.info(f"Gradient data missing for parameter {n}, skipping.")
+        # Copy momentum before the in-place sign, as p.grad may alias new_grad
+        if momentum_dst:
+            torch._foreach_copy_(momentum_dst, momentum_src)
+        if grads:
+            torch._foreach_sign_(grads)
         self.optimizer.step()
         self.scheduler.step()
-        torch.cuda.empty_cache()
 
     def save_state(self):
         """Saves the state of the validator to a file."""
@@ -2288,12 +2444,15 @@ class Validator:
         backoff = 1  # initial backoff in seconds
         max_backoff = 60  # maximum backoff limit
 
+        # Reused across retries: the substrate interface reopens a closed
+        # websocket on its next request, so only unknown errors need a rebuild.
+        subtensor = None
         while not self.stop_event.is_set():
             try:
+                if subtensor is None:
+                    subtensor = bt.subtensor(config=self.config)
                 # This call subscribes to block headers and might throw keepalive errors
-                bt.subtensor(config=self.config).substrate.subscribe_block_headers(
-                    handler
-                )
+                subtensor.substrate.subscribe_block_headers(handler)
                 backoff = 1  # reset backoff if subscription exits without exception
             except websockets.exceptions.ConnectionClosedError as e:
                 tplr.logger.warning(
@@ -2305,10 +2464,73 @@ class Validator:
                 tplr.logger.error(
                     f"Block subscription error: {e}. Retrying in {backoff} seconds."
                 )
+                subtensor = None
                 time.sleep(backoff)
                 backoff = min(backoff * 2, max_backoff)
 
 
+SCORE_TABLE_HEADERS = [
+    "UID",
+    "Last Score",
+    "Binary Indicator",
+    "Binary Moving Avg",
+    "Norm Binary Score",
+    "Final Moving Avg",
+    "Sync score",
+    "Weight",
+]
+
+
+def format_score_table(rows: list[list[str]]) -> str:
+    """Format the per-UID score rows as a plain-text table."""
+    table = [SCORE_TABLE_HEADERS] + rows
+    col_widths = [
+        max(len(row[i]) for row in table) for i in range(len(SCORE_TABLE_HEADERS))
+    ]
+    lines = []
+    for i, row in enumerate(table):
+        lines.append(" | ".join(cell.ljust(w) for cell, w in zip(row, col_widths)))
+        if i == 0:
+            lines.append("-+-".join("-" * w for w in col_widths))
+    return "\n".join(lines)
+
+
+def log_score_table(rows: list[list[str]], use_rich: bool = False) -> None:
+    """Log the per-UID score rows at INFO.
+
+    Plain text by default; with `use_rich` (the `--debug` flag) the table is
+    rendered through rich, which is only imported on that path.
+    """
+    table_str = None
+    if use_rich:
+        try:
+            from rich.console import Console
+            from rich.table import Table
+
+            try:
+                width = os.get_terminal_size().columns
+            except Exception:
+                width = 0
+
+            rich_table = Table(title="Updated scores for evaluated UIDs")
+            for header in SCORE_TABLE_HEADERS:
+                rich_table.add_column(header)
+            for row in rows:
+                rich_table.add_row(*row)
+            sio = StringIO()
+            console = Console(file=sio, width=max(200, width))
+            console.print(rich_table)
+            table_str = sio.getvalue()
+        except ImportError:
+            tplr.logger.warning(
+                "rich module not found; falling back to basic formatting."
+            )
+    if table_str is None:
+        table_str = format_score_table(rows)
+
+    tplr.logger.info("Updated scores for evaluated UIDs:\n" + table_str)
+
+
 def min_power_normalization(logits, power=2.0, epsilon=1e-8):
     """Normalizes logits using a minimum power normalization approach.
 
@@ -2329,10 +2551,12 @@ def min_power_normalization(logits, power=2.0, epsilon=1e-8):
 
     powered_logits = logits**power
     sum_powered = torch.sum(powered_logits)
-    if sum_powered > epsilon:
-        probabilities = powered_logits / sum_powered
-    else:
-        probabilities = torch.zeros_like(powered_logits)
+    # Select on-device rather than branching on the sum, which would sync
+    probabilities = torch.where(
+        sum_powered > epsilon,
+        powered_logits / sum_powered.clamp_min(epsilon),
+        torch.zeros_like(powered_logits),
+    )
 
     return probabilities
 
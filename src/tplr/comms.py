@@ -15,10 +15,13 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 # type: ignore
+import functools
+import io
 import os
 import random
 import re
 import math
+import shutil
 import json
 import time
 from aiobotocore.client import AioBaseClient
@@ -60,6 +63,12 @@ PEERS_FILE_PREFIX = "peers_"
 PeerArray = np.ndarray[Any, np.dtype[np.int64]]
 
 
+@functools.lru_cache(maxsize=256)
+def _gradient_pattern(uid: str) -> re.Pattern:
+    """Compiled pattern for gradient-<window>-<uid>-v<version>.pt filenames."""
+    return re.compile(rf"^gradient-(\d+)-{uid}-v{__version__}.pt$")
+
+
 class Comms(ChainManager):
     def __init__(
         self,
@@ -116,6 +125,12 @@ class Comms(ChainManager):
         self.client_semaphore = asyncio.Semaphore(30)  # Limit concurrent connections
         self.retry_config = {"max_attempts": 3, "backoff_base": 1.5}
 
+        # Last window whose local data was trimmed on the read path, per uid
+        self._local_cleanup_windows: dict[str, int] = {}
+
+        # Reusable CPU staging buffers for checkpoint snapshots
+        self._staging_buffers: dict[str, torch.Tensor] = {}
+
     async def _get_s3_client(self, bucket: Bucket):
         """
         Returns a persistent s3_client for the given bucket credentials.
@@ -220,12 +235,8 @@ class Comms(ChainManager):
         """Safely remove a local directory and all its contents."""
         if not os.path.exists(path):
             return
-        for root, dirs, files in os.walk(path, topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            for name in dirs:
-                os.rmdir(os.path.join(root, name))
-        os.rmdir(path)
+        # rmtree unlinks through scandir and directory fds in a single pass
+        shutil.rmtree(path)
 
     # Convert all the existing functions to methods
     async def cleanup_local_data(
@@ -233,22 +244,27 @@ class Comms(ChainManager):
     ):
         """Clean up stale local data for a given uid."""
         user_dir = os.path.join(LOCAL_TMP_DIR, str(uid))
-        if not os.path.exists(user_dir):
+        try:
+            entries = os.scandir(user_dir)
+        except FileNotFoundError:
             return
 
+        # Window directories are named by number, so DirEntry.name is enough
+        # to pick stale ones without a stat per entry
         min_allowed_window = current_window - stale_retention
-        for wdir in os.listdir(user_dir):
-            if wdir.isdigit():
-                w = int(wdir)
-                if w < min_allowed_window:
-                    old_path = os.path.join(user_dir, wdir)
-                    tplr.logger.debug(f"Removing stale local directory: {old_path}")
-                    try:
-                        self.delete_local_directory(old_path)
-                    except Exception as e:
-                        tplr.logger.debug(
-                            f"Error removing stale directory {old_path}: {e}"
-                        )
+        with entries:
+            stale_paths = [
+                entry.path
+                for entry in entries
+                if entry.name.isdigit() and int(entry.name) < min_allowed_window
+            ]
+
+        for old_path in stale_paths:
+            tplr.logger.debug(f"Removing stale local directory: {old_path}")
+            try:
+                await asyncio.to_thread(self.delete_local_directory, old_path)
+            except Exception as e:
+                tplr.logger.debug(f"Error removing stale directory {old_path}: {e}")
 
     async def cleanup_s3_data(
         self, uid: str, current_window: int, stale_retention: int
@@ -257,9 +273,7 @@ class Comms(ChainManager):
         try:
             min_allowed_window = current_window - stale_retention
 
-            # Regex pattern to match filenames of the form:
-            # gradient-<window>-<uid>-v<version>.pt
-            pattern = re.compile(rf"^gradient-(\d+)-{uid}-v{tplr.__version__}.pt$")
+            pattern = _gradient_pattern(str(uid))
 
             prefix = "gradient"
 
@@ -304,7 +318,7 @@ class Comms(ChainManager):
                     )
                     await s3_client.delete_objects(
                         Bucket=self.bucket.name,
-                        Delete={"Objects": stale_objects},
+                        Delete={"Objects": stale_objects, "Quiet": True},
                     )
 
                 if response.get("IsTruncated"):
@@ -318,6 +332,7 @@ class Comms(ChainManager):
         self,
         key: str,
         file_path: Optional[str] = None,
+        data: Optional[bytes | memoryview] = None,
     ):
         """
         Puts an object into S3 storage, handling different file types appropriately.
@@ -325,6 +340,8 @@ class Comms(ChainManager):
         Args:
             key (str): The key/path to store the data under
             file_path (str, optional): The local file path to upload
+            data (bytes | memoryview, optional): In-memory payload to upload
+                instead of reading file_path
             bucket (Bucket, optional): The bucket to use. Defaults to self.bucket
         """
         try:
@@ -344,17 +361,24 @@ class Comms(ChainManager):
                 return
 
             # Otherwise, likely PyTorch files
-            file_size = os.path.getsize(file_path)
+            if data is not None:
+                file_size = len(data)
+            else:
+                file_size = os.path.getsize(file_path)
             multipart_threshold = 100 * 1024 * 1024  # 100MB
 
             if file_size <= multipart_threshold:
                 # Simple upload for small files
-                async with aiofiles.open(file_path, "rb") as f:
-                    data = await f.read()
-                    await s3_client.put_object(Bucket=bucket.name, Key=key, Body=data)
+                if data is None:
+                    async with aiofiles.open(file_path, "rb") as f:
+                        data = await f.read()
+                elif isinstance(data, memoryview):
+                    # botocore only accepts bytes-like bodies it can hash
+                    data = bytes(data)
+                await s3_client.put_object(Bucket=bucket.name, Key=key, Body=data)
             else:
                 # Multipart upload for large files
-                await self.upload_large_file(file_path, key, s3_client)
+                await self.upload_large_file(file_path, key, s3_client, data=data)
 
         except (ConnectionClosedError, ClientError):
             await self._purge_s3_client(bucket)
@@ -427,10 +451,15 @@ class Comms(ChainManager):
                     s3_client.get_object(Bucket=bucket.name, Key=key),
                     timeout=timeout,
                 )
-                async with aiofiles.open(temp_file_path, "wb") as f:
-                    async with response["Body"] as stream:
-                        data = await asyncio.wait_for(stream.read(), timeout=timeout)
-                        await f.write(data)
+
+                async def stream_to_file():
+                    # Write as chunks arrive instead of buffering the whole object
+                    async with aiofiles.open(temp_file_path, "wb") as f:
+                        async with response["Body"] as stream:
+                            async for chunk in stream.iter_chunks(chunk_size=1 << 20):
+                                await f.write(chunk)
+
+                await asyncio.wait_for(stream_to_file(), timeout=timeout)
             else:
                 success = await self.download_large_file(
                     s3_client=s3_client,
@@ -448,7 +477,8 @@ class Comms(ChainManager):
                     data = await f.read()
                     loaded_data = json.loads(data)
             else:
-                loaded_data = torch.load(
+                loaded_data = await asyncio.to_thread(
+                    torch.load,
                     temp_file_path,
                     map_location=self.config.device,
                     weights_only=False,
@@ -468,8 +498,18 @@ class Comms(ChainManager):
 
     #  Large File Operations
 
-    async def upload_large_file(self, file_path: str, key: str, s3_client):
-        """Uploads a large file to S3 using asynchronous multipart upload with 5MB chunks."""
+    async def upload_large_file(
+        self,
+        file_path: Optional[str],
+        key: str,
+        s3_client,
+        data: Optional[bytes | memoryview] = None,
+    ):
+        """Uploads a large file to S3 using asynchronous multipart upload with 5MB chunks.
+
+        When ``data`` is given, parts are sliced from it instead of read from
+        ``file_path``.
+        """
         upload_id = None
         MAX_RETRIES = 3
         PART_SIZE = 5 * 1024 * 1024  # 5MB
@@ -488,7 +528,10 @@ class Comms(ChainManager):
                             raise
                         await asyncio.sleep(2**attempt)
 
-                file_size = os.path.getsize(file_path)
+                if data is not None:
+                    file_size = len(data)
+                else:
+                    file_size = os.path.getsize(file_path)
                 total_parts = math.ceil(file_size / PART_SIZE)
                 parts = []
 
@@ -498,16 +541,21 @@ class Comms(ChainManager):
 
                     for attempt in range(MAX_RETRIES):
                         try:
-                            async with aiofiles.open(file_path, "rb") as f:
-                                await f.seek(byte_range_start)
-                                data = await f.read(byte_range_end - byte_range_start)
+                            if data is not None:
+                                part = bytes(data[byte_range_start:byte_range_end])
+                            else:
+                                async with aiofiles.open(file_path, "rb") as f:
+                                    await f.seek(byte_range_start)
+                                    part = await f.read(
+                                        byte_range_end - byte_range_start
+                                    )
 
                             response = await s3_client.upload_part(
                                 Bucket=self.bucket.name,
                                 Key=key,
                                 PartNumber=part_number,
                                 UploadId=upload_id,
-                                Body=data,
+                                Body=part,
                             )
                             return {
                                 "ETag": response["ETag"],
@@ -722,24 +770,25 @@ class Comms(ChainManager):
 
         put_start = tplr.T()
 
-        # Create per-uid temp directory
-        temp_dir = os.path.join("/tmp", str(self.uid))
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_file_path = os.path.join(temp_dir, f"temp_{filename}")
-
+        # Prepare the data to be saved
+        if key == "checkpoint":
+            save_data = state_dict
+        else:
+            save_data = {
+                "state_dict": state_dict,
+                "global_step": global_step,
+            }
+
+        # Serialize once in memory, off the event loop; both paths consume the
+        # same buffer
+        buffer = io.BytesIO()
+        await asyncio.to_thread(torch.save, save_data, buffer)
+
+        # Both paths read the buffer through a view rather than a copy, which
+        # matters for multi-GB checkpoints; the view is released before the
+        # buffer is closed
+        payload = buffer.getbuffer()
         try:
-            # Prepare the data to be saved
-            if key == "checkpoint":
-                save_data = state_dict
-            else:
-                save_data = {
-                    "state_dict": state_dict,
-                    "global_step": global_step,
-                }
-
-            # Save to temp file
-            torch.save(save_data, temp_file_path)
-
             if local:
                 # Local storage with per-uid directories
                 await self.cleanup_local_data(
@@ -748,24 +797,37 @@ class Comms(ChainManager):
                 local_dir = os.path.join(LOCAL_TMP_DIR, str(uid), str(window))
                 os.makedirs(local_dir, exist_ok=True)
                 final_path = os.path.join(local_dir, filename)
-                os.replace(temp_file_path, final_path)
+                await asyncio.to_thread(self._write_local_file, final_path, payload)
             else:
-                await self.s3_put_object(filename, temp_file_path)
                 # Remote storage with automatic handling of large files
+                await self.s3_put_object(filename, data=payload)
                 asyncio.create_task(
                     self.cleanup_s3_data(
                         uid=uid, current_window=window, stale_retention=stale_retention
                     )
                 )
-
         finally:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
+            payload.release()
+            buffer.close()
 
         put_end = tplr.T()
         tplr.logger.info(f"{tplr.P(window, put_end - put_start)} PUT {filename} <--")
         return put_end - put_start
 
+    @staticmethod
+    def _write_local_file(final_path: str, payload: memoryview) -> None:
+        """Write payload beside final_path and rename it into place, so readers
+        never see a partial file."""
+        partial_path = f"{final_path}.partial"
+        fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            written = 0
+            while written < len(payload):
+                written += os.write(fd, payload[written:])
+        finally:
+            os.close(fd)
+        os.replace(partial_path, final_path)
+
     async def get(
         self,
         uid: str,
@@ -782,17 +844,22 @@ class Comms(ChainManager):
 
         try:
             if local:
-                # Local storage logic remains unchanged
-                await self.cleanup_local_data(
-                    uid=uid, current_window=window, stale_retention=stale_retention
-                )
+                # Stale windows only change when the window does, so trim once
+                # per uid and window rather than on every read
+                if self._local_cleanup_windows.get(str(uid)) != window:
+                    self._local_cleanup_windows[str(uid)] = window
+                    await self.cleanup_local_data(
+                        uid=uid, current_window=window, stale_retention=stale_retention
+                    )
                 local_path = os.path.join(
                     LOCAL_TMP_DIR, str(uid), str(window), filename
                 )
                 if not os.path.exists(local_path):
                     tplr.logger.debug(f"Local file not found: {local_path}")
                     return None
-                loaded_data = torch.load(local_path, weights_only=True)
+                loaded_data = await asyncio.to_thread(
+                    torch.load, local_path, mmap=True, weights_only=True
+                )
                 if key == "checkpoint":
                     return loaded_data, None
                 state_dict = loaded_data.get("state_dict")
@@ -941,6 +1008,7 @@ class Comms(ChainManager):
                     *batch_tasks, return_exceptions=True
                 )
 
+                candidates = []
                 for uid, response in zip(uids, batch_responses):
                     if isinstance(response, Exception):
                         tplr.logger.debug(f"Error from UID {uid}: {str(response)}")
@@ -966,44 +1034,25 @@ class Comms(ChainManager):
                         skipped_uids.append(uid)
                         continue
 
-                    # ---------- Begin Compressed Indices and Values Check ----------
-                    valid_response = True
-                    for param_name, tensor in state_dict_resp.items():
-                        if param_name.endswith("idxs"):
-                            base_name = param_name[:-4]
-                            totalk = totalks.get(base_name)
-                            if totalk is None:
-                                tplr.logger.warning(
-                                    f"Missing totalk for parameter {base_name} from UID {uid}, skipping UID."
-                                )
-                                valid_response = False
-                                break
-                            try:
-                                self.check_compressed_indices(
-                                    param_name,
-                                    tensor.to(device),
-                                    totalk,
-                                    allowed_topk=self.hparams.topk_compression,
-                                )
-                            except Exception as e:
-                                tplr.logger.warning(
-                                    f"Compressed indices check failed for parameter {param_name} from UID {uid}: {e}"
-                                )
-                                valid_response = False
-                                break
-                        # Check if values are valid (not NaN, not Inf)
-                        elif param_name.endswith("vals"):
-                            tensor_to_check = tensor.to(device)
-                            if (
-                                torch.isnan(tensor_to_check).any()
-                                or torch.isinf(tensor_to_check).any()
-                            ):
-                                tplr.logger.warning(
-                                    f"NaN/Inf in {param_name} from UID {uid}, skipping"
-                                )
-                                valid_response = False
-                                break
+                    candidates.append((uid, state_dict_resp, global_step_resp))
+
+                # Validate every peer's indices and values concurrently
+                checks = await asyncio.gather(
+                    *[
+                        asyncio.to_thread(
+                            self._validate_gather_response,
+                            uid,
+                            state_dict_resp,
+                            totalks,
+                            device,
+                        )
+                        for uid, state_dict_resp, _ in candidates
+                    ]
+                )
 
+                for (uid, state_dict_resp, global_step_resp), valid_response in zip(
+                    candidates, checks
+                ):
                     # If any check failed, skip this UID entirely
                     if not valid_response:
                         tplr.logger.info(
@@ -1011,7 +1060,6 @@ class Comms(ChainManager):
                         )
                         skipped_uids.append(uid)
                         continue
-                    # ---------- End Compressed Indices and Values Check ----------
 
                     # Process tensors (with normalization on 'vals' keys).
                     for param_name, tensor in state_dict_resp.items():
@@ -1212,7 +1260,7 @@ class Comms(ChainManager):
                     return result
 
             # 3. Check local storage
-            local_result = self._load_latest_local_checkpoint()
+            local_result = await asyncio.to_thread(self._load_latest_local_checkpoint)
             if local_result:
                 return local_result
 
@@ -1228,36 +1276,34 @@ class Comms(ChainManager):
     def _load_latest_local_checkpoint(self):
         try:
             local_dir = os.path.join(LOCAL_TMP_DIR, str(self.uid))
-            pattern = rf"checkpoint-(\d+)-{self.uid}-v{__version__}\.pt$"
+            pattern = re.compile(rf"checkpoint-(\d+)-{self.uid}-v{__version__}\.pt$")
 
             if not os.path.exists(local_dir):
                 return None
 
-            checkpoints = []
-            for window_dir in os.listdir(local_dir):
-                path = os.path.join(local_dir, window_dir)
-                if not os.path.isdir(path):
-                    continue
-
-                for file in os.listdir(path):
-                    match = re.match(pattern, file)
-                    if match:
-                        # window number comes from match.group(1)
-                        w = int(match.group(1))
-                        file_path = os.path.join(path, file)
-                        checkpoints.append(
-                            {
-                                "path": file_path,
-                                "window": w,
-                                "modified": os.path.getmtime(file_path),
-                            }
-                        )
+            # Single pass tracking the newest file; DirEntry caches its stat
+            latest_path, latest_window, latest_mtime = None, None, -1.0
+            with os.scandir(local_dir) as window_dirs:
+                for window_dir in window_dirs:
+                    if not window_dir.is_dir():
+                        continue
 
-            if checkpoints:
+                    with os.scandir(window_dir.path) as files:
+                        for file in files:
+                            match = pattern.match(file.name)
+                            if not match:
+                                continue
+                            mtime = file.stat().st_mtime
+                            if mtime > latest_mtime:
+                                # window number comes from match.group(1)
+                                latest_path = file.path
+                                latest_window = int(match.group(1))
+                                latest_mtime = mtime
+
+            if latest_path is not None:
                 # choose the last modified checkpoint
-                latest = max(checkpoints, key=lambda x: x["modified"])
-                checkpoint_data = torch.load(latest["path"], weights_only=True)
-                return checkpoint_data, latest["window"]
+                checkpoint_data = torch.load(latest_path, mmap=True, weights_only=True)
+                return checkpoint_data, latest_window
             else:
                 return None
         except Exception as e:
@@ -1571,18 +1617,17 @@ class Comms(ChainManager):
     ):
         """Save checkpoint to R2 and local storage."""
         checkpoint_data = {
-            "model_state_dict": {
-                k: v.cpu().clone() for k, v in model.state_dict().items()
-            },
+            "model_state_dict": self.stage_tensors("model", model.state_dict()),
             "optimizer_state_dict": {
                 k: v.cpu().clone() if torch.is_tensor(v) else v
                 for k, v in optimizer.state_dict().items()
             },
             "scheduler_state_dict": scheduler.state_dict(),
-            "momentum": {k: v.cpu().clone() for k, v in momentum.items()},
+            "momentum": self.stage_tensors("momentum", momentum),
             "start_window": start_window,
             "current_window": current_window,
         }
+        await self.wait_for_staged_tensors()
 
         # save locally
         await self.put(
@@ -1606,6 +1651,45 @@ class Comms(ChainManager):
 
         return True
 
+    def stage_tensors(self, prefix: str, tensors: dict) -> dict:
+        """Copy tensors into persistent CPU buffers before saving or uploading.
+
+        Buffers are pinned when CUDA is available and reused across calls with
+        the same prefix, and the copies are issued non-blocking on the current
+        stream so later in-place updates of the source tensors stay ordered
+        after them. Non-tensor values are passed through unchanged. Callers must
+        await `wait_for_staged_tensors` before reading the returned tensors.
+        """
+        staged = {}
+        for name, tensor in tensors.items():
+            if not isinstance(tensor, torch.Tensor):
+                staged[name] = tensor
+                continue
+            key = f"{prefix}.{name}"
+            buffer = self._staging_buffers.get(key)
+            if (
+                buffer is None
+                or buffer.shape != tensor.shape
+                or buffer.dtype != tensor.dtype
+            ):
+                buffer = torch.empty(
+                    tensor.shape,
+                    dtype=tensor.dtype,
+                    device="cpu",
+                    pin_memory=torch.cuda.is_available(),
+                )
+                self._staging_buffers[key] = buffer
+            buffer.copy_(tensor.detach(), non_blocking=True)
+            staged[name] = buffer
+        return staged
+
+    async def wait_for_staged_tensors(self):
+        """Wait for pending `stage_tensors` copies without blocking the event loop."""
+        if torch.cuda.is_available():
+            copy_done = torch.cuda.Event()
+            copy_done.record()
+            await asyncio.to_thread(copy_done.synchronize)
+
     async def _gather_window_batch(
         self,
         batch_windows: List[int],
@@ -1683,8 +1767,7 @@ class Comms(ChainManager):
                 return False, global_step
 
             model.train()
-            optimizer.zero_grad()
-            model.zero_grad()
+            optimizer.zero_grad(set_to_none=True)
 
             # Apply gradients
             for n, p in model.named_parameters():
@@ -1727,6 +1810,43 @@ class Comms(ChainManager):
             )
             return False, global_step
 
+    def _validate_gather_response(
+        self, uid: int, state_dict_resp: dict, totalks: dict, device: str
+    ) -> bool:
+        """Check one peer's compressed indices and values before aggregation.
+
+        Only tensor ops run here, so gather can check all peers in threads.
+        """
+        for param_name, tensor in state_dict_resp.items():
+            if param_name.endswith("idxs"):
+                base_name = param_name[:-4]
+                totalk = totalks.get(base_name)
+                if totalk is None:
+                    tplr.logger.warning(
+                        f"Missing totalk for parameter {base_name} from UID {uid}, skipping UID."
+                    )
+                    return False
+                try:
+                    self.check_compressed_indices(
+                        param_name,
+                        tensor.to(device),
+                        totalk,
+                        allowed_topk=self.hparams.topk_compression,
+                    )
+                except Exception as e:
+                    tplr.logger.warning(
+                        f"Compressed indices check failed for parameter {param_name} from UID {uid}: {e}"
+                    )
+                    return False
+            # Check if values are valid (not NaN, not Inf)
+            elif param_name.endswith("vals"):
+                if not torch.isfinite(tensor.to(device)).all():
+                    tplr.logger.warning(
+                        f"NaN/Inf in {param_name} from UID {uid}, skipping"
+                    )
+                    return False
+        return True
+
     def check_compressed_indices(
         self, param_name: str, idxs, totalk: int, allowed_topk: int | None = None
     ) -> None:
@@ -1770,23 +1890,19 @@ class Comms(ChainManager):
                     raise ValueError(
                         f"[{param_name}] Invalid number of indices: got {idxs.size(0)} but expected {allowed_topk}"
                     )
-                for idx in idxs.tolist():
-                    if not (0 <= int(idx) < totalk):
-                        raise ValueError(
-                            f"[{param_name}] Index {int(idx)} out of bounds (totalk = {totalk})"
-                        )
             else:
                 # Multi-dimensional: check that the last dimension equals allowed_topk.
                 if idxs.size(-1) != allowed_topk:
                     raise ValueError(
                         f"[{param_name}] Last dimension size invalid: got {idxs.size(-1)} but expected {allowed_topk}"
                     )
-                # Check all indices in the tensor.
-                for idx in idxs.flatten().tolist():
-                    if not (0 <= int(idx) < totalk):
-                        raise ValueError(
-                            f"[{param_name}] Index {int(idx)} out of bounds (totalk = {totalk})"
-                        )
+            # Check all indices in the tensor with one vectorized comparison.
+            out_of_bounds = (idxs < 0) | (idxs >= totalk)
+            if out_of_bounds.any():
+                bad_idx = int(idxs[out_of_bounds][0])
+                raise ValueError(
+                    f"[{param_name}] Index {bad_idx} out of bounds (totalk = {totalk})"
+                )
         # If idxs is a list or tuple
         elif isinstance(idxs, (list, tuple)):
             if idxs and isinstance(idxs[0], (list, tuple)):
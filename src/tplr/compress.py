@@ -73,6 +73,15 @@ class TransformDCT:
             # Note: b-c axis output is transposed to chunk DCT in 2D
             return torch.einsum("...ijkl, kb, ld -> ...ibjd", x, b, d)
 
+    def encoded_shape(self, shape):
+        """Shape `encode` produces for a tensor of `shape`, without running it."""
+        if len(shape) > 1:  # 2D weights
+            n1 = self.shape_dict[shape[0]]
+            n2 = self.shape_dict[shape[1]]
+            return torch.Size((shape[0] // n1, shape[1] // n2, n1, n2))
+        n1 = self.shape_dict[shape[0]]
+        return torch.Size((shape[0] // n1, n1))
+
     @torch.no_grad()
     def encode(self, x):
         if len(x.shape) > 1:  # 2D weights
@@ -132,6 +141,12 @@ class CompressDCT:
             topk = 1
         return topk
     
+    def topk_shape(self, xshape):
+        """`(xshape, totalk)` that `compress` reports for an encoded `xshape`."""
+        xshape = torch.Size(xshape)
+        totalk = math.prod(xshape[2:]) if len(xshape) > 2 else xshape[-1]
+        return xshape, totalk
+
     @torch.no_grad()
     def compress(self, x, topk):
         xshape = x.shape
@@ -161,6 +176,8 @@ class CompressDCT:
 
         # Cast back to int64 before using scatter/gather
         idx_int64 = idx.to(torch.int64)
+        # Peers may send values in a different precision than the local model
+        val = val.to(dtype=x.dtype)
         x.scatter_reduce_(
             dim=-1, index=idx_int64, src=val, reduce="mean", include_self=False
         ).reshape(xshape)
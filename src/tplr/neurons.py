@@ -16,6 +16,8 @@
 # DEALINGS IN THE SOFTWARE.
 
 
+import asyncio
+import logging
 import math
 import time
 from typing import TYPE_CHECKING, TypeVar, cast
@@ -59,33 +61,59 @@ def prepare_gradient_dict(miner, pages, step_window):
     transmitted = {}
     lr = miner.scheduler.get_last_lr()[0]
 
+    # Parameters of the same shape share an encoded (rows x chunk) layout, so
+    # their DCT rows can be top-k compressed together with a single call.
+    groups: dict[tuple, list[tuple[str, torch.Tensor]]] = {}
     for n, p in miner.model.named_parameters():
-        # Apply weight decay.
-        p.data.mul_(1.0 - lr * miner.hparams.weight_decay)
-        # Apply momentum decay.
-        miner.momentum[n].mul_(miner.hparams.momentum_decay)
-        # Ensure the gradient is on the same device as the parameter.
-        grad = p.grad.to(p.device)
-        # Ensure the momentum tensor is on the same device.
-        if miner.momentum[n].device != p.device:
-            miner.momentum[n] = miner.momentum[n].to(p.device)
-        miner.momentum[n].add_(grad, alpha=lr)
-        # Compress momentum via DCT-based compression.
-        idxs, vals, xshape, totalk = miner.compressor.compress(
-            miner.transformer.encode(miner.momentum[n]), miner.hparams.topk_compression
-        )
-        # Estimate the transmitted gradient via decompression.
-        transmit_grad = miner.transformer.decode(
-            miner.compressor.decompress(p, idxs, vals, xshape, totalk)
-        )
-        # Subtract the transmitted gradient from momentum.
-        miner.momentum[n].sub_(transmit_grad)
-        # Save compressed gradient information.
-        gradient[n + "idxs"] = idxs
-        gradient[n + "vals"] = vals
-        xshapes[n] = xshape
-        totalks[n] = totalk
-        transmitted[n] = transmit_grad
+        groups.setdefault((p.shape, p.dtype, p.device), []).append((n, p))
+
+    for group in groups.values():
+        encoded = []
+        for n, p in group:
+            # Apply weight decay.
+            p.data.mul_(1.0 - lr * miner.hparams.weight_decay)
+            # Apply momentum decay.
+            miner.momentum[n].mul_(miner.hparams.momentum_decay)
+            # Ensure the gradient is on the same device as the parameter.
+            grad = p.grad.to(p.device)
+            # Ensure the momentum tensor is on the same device.
+            if miner.momentum[n].device != p.device:
+                miner.momentum[n] = miner.momentum[n].to(p.device)
+            miner.momentum[n].add_(grad, alpha=lr)
+            encoded.append(miner.transformer.encode(miner.momentum[n]))
+
+        # Compress momentum via DCT-based compression. Top-k is taken per row,
+        # so stacking the rows of the whole group gives identical results.
+        if len(encoded) > 1 and encoded[0].dim() > 1:
+            idxs, vals, _, totalk = miner.compressor.compress(
+                torch.cat(encoded), miner.hparams.topk_compression
+            )
+            rows = [x.shape[0] for x in encoded]
+            # Clone the splits so each tensor serializes only its own storage.
+            compressed = [
+                (i.clone(), v.clone(), x.shape, totalk)
+                for i, v, x in zip(idxs.split(rows), vals.split(rows), encoded)
+            ]
+        else:
+            compressed = [
+                miner.compressor.compress(x, miner.hparams.topk_compression)
+                for x in encoded
+            ]
+        del encoded
+
+        for (n, p), (idxs, vals, xshape, totalk) in zip(group, compressed):
+            # Estimate the transmitted gradient via decompression.
+            transmit_grad = miner.transformer.decode(
+                miner.compressor.decompress(p, idxs, vals, xshape, totalk)
+            )
+            # Subtract the transmitted gradient from momentum.
+            miner.momentum[n].sub_(transmit_grad)
+            # Save compressed gradient information.
+            gradient[n + "idxs"] = idxs
+            gradient[n + "vals"] = vals
+            xshapes[n] = xshape
+            totalks[n] = totalk
+            transmitted[n] = transmit_grad
 
     # Attach metadata for pages info and window.
     gradient["metadata"] = {"pages_info": pages, "window": step_window}
@@ -164,8 +192,10 @@ async def catchup_with_aggregation_server(
         f"Catching up from window {checkpoint_window} to current window {target_window}"
     )
 
-    # Apply aggregation for each step, checking for current window changes
+    # Apply aggregation for each step, checking for current window changes.
+    # The next window's aggregation is downloaded while the current one applies.
     current_step = checkpoint_window
+    pending_agg: asyncio.Task | None = None
     while current_step < target_window:
         # Check if current_window has changed during processing
         if instance.current_window > target_window:
@@ -178,8 +208,16 @@ async def catchup_with_aggregation_server(
             f"\nProcessing catchup for window {current_step} (Target: {target_window})"
         )
 
-        # Load aggregation for current window - pass version explicitly
-        agg_data = await instance.comms.load_aggregation(window=current_step)
+        # Load aggregation for current window, prefetched by the previous iteration
+        if pending_agg is not None:
+            agg_data = await pending_agg
+        else:
+            agg_data = await instance.comms.load_aggregation(window=current_step)
+        pending_agg = None
+        if current_step + 1 < target_window:
+            pending_agg = asyncio.create_task(
+                instance.comms.load_aggregation(window=current_step + 1)
+            )
 
         # Process the aggregation data if available
         if agg_data:
@@ -189,28 +227,22 @@ async def catchup_with_aggregation_server(
             processed_agg_data = process_loaded_data(instance.model, agg_data)
 
             if processed_agg_data is not None:
+                # The debug-dict comparison is diagnostic only; skip it unless
+                # debug logging is on. Otherwise fetch it while the update applies.
+                debug_dict_task = None
+                if logger.isEnabledFor(logging.DEBUG):
+                    debug_dict_task = asyncio.create_task(
+                        instance.comms.get_debug_dict(current_step)
+                    )
+
                 # Get learning rate for this step
                 lr = instance.scheduler.get_last_lr()[0]
                 weight_decay = instance.hparams.weight_decay
 
                 # Apply the gradients to the model parameters (instead of updating parameters directly)
-                for name, param in instance.model.named_parameters():
-                    if name in processed_agg_data["tensors"]:
-                        # Apply weight decay to the parameter manually if needed
-                        if weight_decay > 0:
-                            with torch.no_grad():
-                                param.data.mul_(1.0 - lr * weight_decay)
-
-                        # Move aggregation tensor to device
-                        agg_tensor = processed_agg_data["tensors"][name].to(
-                            instance.config.device  # type: ignore
-                        )
-
-                        # Set the gradient instead of directly updating the parameter
-                        if param.grad is None:
-                            param.grad = agg_tensor
-                        else:
-                            param.grad.copy_(agg_tensor)
+                stage_aggregated_update(
+                    instance.model, processed_agg_data["tensors"], lr, weight_decay
+                )
 
                 logger.info(
                     f"Window {current_step} - Set gradients in {time.time() - update_start:.2f}s"
@@ -225,49 +257,50 @@ async def catchup_with_aggregation_server(
                     f"Successfully applied aggregation for window {current_step}"
                 )
 
-                # Get debug dict and compare with current model parameters
-                debug_dict_result = await instance.comms.get_debug_dict(current_step)
-                if (
-                    isinstance(debug_dict_result, dict)
-                    and "state_dict" in debug_dict_result
-                ):
-                    debug_state_dict = cast(
-                        dict[str, list[float]], debug_dict_result["state_dict"]
-                    )
-
-                    # Use our new function to compare model with debug dict
-                    comparison_metrics = await compare_model_with_debug_dict(
-                        model=instance.model,
-                        debug_dict=debug_state_dict,
-                        learning_rate=lr,
-                    )
-
-                    if comparison_metrics["success"]:
-                        # Log the comparison metrics
-                        logger.info(
-                            f"Window {current_step} - L2 norm difference between model and debug values: "
-                            f"{comparison_metrics['l2_norm']}"
-                        )
-                        logger.info(
-                            f"Window {current_step} - Average L2 norm per parameter: "
-                            f"{comparison_metrics['avg_l2_norm']}"
-                        )
-                        logger.info(
-                            f"Window {current_step} - Average absolute difference per parameter: "
-                            f"{comparison_metrics['avg_abs_diff']}"
+                if debug_dict_task is not None:
+                    # Get debug dict and compare with current model parameters
+                    debug_dict_result = await debug_dict_task
+                    if (
+                        isinstance(debug_dict_result, dict)
+                        and "state_dict" in debug_dict_result
+                    ):
+                        debug_state_dict = cast(
+                            dict[str, list[float]], debug_dict_result["state_dict"]
                         )
-                        logger.info(
-                            f"Window {current_step} - Average steps behind: "
-                            f"{comparison_metrics['avg_steps_behind']}"
+
+                        # Use our new function to compare model with debug dict
+                        comparison_metrics = await compare_model_with_debug_dict(
+                            model=instance.model,
+                            debug_dict=debug_state_dict,
+                            learning_rate=lr,
                         )
+
+                        if comparison_metrics["success"]:
+                            # Log the comparison metrics
+                            logger.info(
+                                f"Window {current_step} - L2 norm difference between model and debug values: "
+                                f"{comparison_metrics['l2_norm']}"
+                            )
+                            logger.info(
+                                f"Window {current_step} - Average L2 norm per parameter: "
+                                f"{comparison_metrics['avg_l2_norm']}"
+                            )
+                            logger.info(
+                                f"Window {current_step} - Average absolute difference per parameter: "
+                                f"{comparison_metrics['avg_abs_diff']}"
+                            )
+                            logger.info(
+                                f"Window {current_step} - Average steps behind: "
+                                f"{comparison_metrics['avg_steps_behind']}"
+                            )
+                        else:
+                            logger.warning(
+                                f"Failed to compare model with debug dict for window {current_step}"
+                            )
                     else:
                         logger.warning(
-                            f"Failed to compare model with debug dict for window {current_step}"
+                            f"Invalid debug dict format for window {current_step}"
                         )
-                else:
-                    logger.warning(
-                        f"Invalid debug dict format for window {current_step}"
-                    )
             else:
                 logger.warning(
                     f"Failed to process aggregation data for window {current_step}"
@@ -288,6 +321,34 @@ async def catchup_with_aggregation_server(
     logger.info(f"Catchup complete. Global step updated to {instance.global_step}")
 
 
+@torch.no_grad()
+def stage_aggregated_update(
+    model: nn.Module, tensors: dict[str, torch.Tensor], lr: float, weight_decay: float
+) -> None:
+    """
+    Set unpacked aggregation tensors as gradients and apply weight decay.
+
+    The parameter update itself is left to the optimizer step.
+
+    Args:
+        model: The model being caught up
+        tensors: Unpacked ±1 tensors keyed by parameter name
+        lr: Current learning rate
+        weight_decay: Weight decay coefficient
+    """
+    agg_params = []
+    for name, param in model.named_parameters():
+        if name in tensors:
+            agg_params.append(param)
+            # Set the gradient instead of directly updating the parameter
+            param.grad = tensors[name].to(device=param.device, dtype=param.dtype)
+
+    # Apply weight decay to all updated parameters in one fused call
+    if weight_decay > 0 and agg_params:
+        torch._foreach_mul_(agg_params, 1.0 - lr * weight_decay)
+
+
+@torch.no_grad()
 def process_loaded_data(model: torch.nn.Module, compressed_data: dict) -> dict | None:
     """
     Unpack the compressed tensor data from the aggregation server.
@@ -309,13 +370,26 @@ def process_loaded_data(model: torch.nn.Module, compressed_data: dict) -> dict |
         "tensors": {},
     }
 
+    # Group parameters by where they live so each group unpacks in a single call
+    groups: dict[tuple[torch.device, torch.dtype], list[tuple[str, nn.Parameter]]] = {}
     for name, param in model.named_parameters():
         if name in state_dict:
-            original_shape = param.shape
-            # Use unpack_binary_tensor from the sample, but in our context
-            unpacked = unpack_binary_tensor(state_dict[name], original_shape)
-            result["tensors"][name] = unpacked
-            logger.debug(f"Unpacked tensor {name} with shape {original_shape}")
+            groups.setdefault((param.device, param.dtype), []).append((name, param))
+
+    for (device, dtype), params in groups.items():
+        # Unpack where the parameters live; the packed bytes are 8x smaller to move
+        packed = [state_dict[name].to(device).reshape(-1) for name, _ in params]
+        flat = unpack_binary_tensor(
+            torch.cat(packed), torch.Size([8 * sum(p.numel() for p in packed)]), dtype
+        )
+        # Each parameter gets a view into the flat buffer at its own byte offset
+        offset = 0
+        for (name, param), param_packed in zip(params, packed):
+            result["tensors"][name] = flat[offset : offset + param.numel()].view(
+                param.shape
+            )
+            offset += 8 * param_packed.numel()
+            logger.debug(f"Unpacked tensor {name} with shape {param.shape}")
 
     logger.info(f"Successfully unpacked {len(result['tensors'])} tensors")
     return result
@@ -338,41 +412,46 @@ async def compare_model_with_debug_dict(
     Returns:
         dict: Comparison metrics including L2 norm, absolute differences, and steps behind measurements
     """
-    # Initialize metrics
-    total_squared_diff = 0.0
-    total_abs_diff = 0.0
-    param_count = 0
-    max_diff = 0.0
-
-    # Compare each parameter with its debug entry
+    # Collect every compared slice so the reductions need a single sync
+    param_slices = []
+    debug_values: list[float] = []
     for name, param in model.named_parameters():
         debug_key = name + "_debug"
 
         if debug_key in debug_dict and isinstance(debug_dict[debug_key], list):
             # Get the parameter values (first two elements to match debug dict)
-            param_data = param.data.flatten()[
-                index_range[0] : index_range[1]
-            ].detach()  # Keep on device
-
-            # Convert debug data to tensor on the same device
-            debug_data = torch.tensor(
-                debug_dict[debug_key], device=param.device, dtype=param.dtype
-            )
-
-            # Compute differences
-            diffs = param_data - debug_data
-            squared_diff = torch.sum(diffs**2).item()
-            abs_diff = torch.abs(diffs).sum().item()
-            max_param_diff = torch.max(torch.abs(diffs)).item()
+            param_slice = param.data.flatten()[index_range[0] : index_range[1]]
+            # Entries are compared after concatenation, so a length mismatch
+            # would misalign every later parameter; skip it instead
+            if len(debug_dict[debug_key]) != param_slice.numel():
+                logger.warning(
+                    f"Debug entry for {name} has {len(debug_dict[debug_key])} "
+                    f"values, expected {param_slice.numel()}; skipping"
+                )
+                continue
+            param_slices.append(param_slice.detach())
+            debug_values.extend(debug_dict[debug_key])
 
-            # Update totals
-            total_squared_diff += squared_diff
-            total_abs_diff += abs_diff
-            param_count += param_data.numel()
-            max_diff = max(max_diff, max_param_diff)
+    total_squared_diff = 0.0
+    total_abs_diff = 0.0
+    param_count = 0
+    max_diff = 0.0
+    if param_slices:
+        device = param_slices[0].device
+        param_data = torch.cat([t.to(device) for t in param_slices])
+        debug_data = torch.tensor(debug_values, device=device, dtype=param_data.dtype)
+
+        # Compute differences on device and copy the three totals back at once
+        abs_diffs = (param_data - debug_data).abs()
+        total_squared_diff, total_abs_diff, max_diff = (
+            torch.stack([abs_diffs.square().sum(), abs_diffs.sum(), abs_diffs.max()])
+            .float()
+            .tolist()
+        )
+        param_count = param_data.numel()
 
     # Calculate final metrics
-    l2_norm = torch.sqrt(torch.tensor(total_squared_diff)).item()
+    l2_norm = math.sqrt(total_squared_diff)
     avg_l2_norm = l2_norm / param_count if param_count > 0 else math.inf
     avg_abs_diff = total_abs_diff / param_count if param_count > 0 else math.inf
 
@@ -396,41 +475,51 @@ async def compare_model_with_debug_dict(
     return metrics
 
 
-def unpack_binary_tensor(packed_tensor: torch.Tensor, original_shape: torch.Size):
+# Row b holds the ±1 values encoded by byte b, lowest bit first
+_BYTE_TO_SIGNS = (
+    (torch.arange(256, dtype=torch.int32).unsqueeze(-1) >> torch.arange(8)) & 1
+).to(torch.float32) * 2 - 1
+
+
+def unpack_binary_tensor(
+    packed_tensor: torch.Tensor,
+    original_shape: torch.Size,
+    dtype: torch.dtype = torch.float32,
+):
     """
     Unpack a 1-bit representation tensor back to ±1 values.
 
     Args:
         packed_tensor: The packed binary tensor
         original_shape: The original shape of the tensor
+        dtype: Output dtype; ±1 is exact in any float format
 
     Returns:
         Unpacked tensor with original shape
     """
-    total_elements = int(torch.prod(torch.tensor(original_shape)).item())
+    total_elements = math.prod(original_shape)
 
-    # Create a flat tensor to hold the unpacked values
-    unpacked = torch.zeros(total_elements, dtype=torch.float32)
-
-    for i in range(8):
-        mask = 1 << i
-        bits = (packed_tensor & mask) >> i
-        # Convert 0/1 to -1/+1
-        unpacked[i::8] = (bits.float() * 2) - 1
+    # Bit i of byte j holds element 8*j + i
+    packed_tensor = packed_tensor.to(torch.uint8).reshape(-1)
+    if packed_tensor.device.type == "cpu":
+        # One gather of 8 ready-made ±1 values per byte
+        unpacked = _BYTE_TO_SIGNS.index_select(0, packed_tensor.int()).to(dtype)
+    else:
+        # Expand all 8 bits in one broadcast pass, then convert 0/1 to -1/+1
+        shifts = torch.arange(8, dtype=torch.uint8, device=packed_tensor.device)
+        bits = (packed_tensor.unsqueeze(-1) >> shifts) & 1
+        unpacked = bits.to(dtype).mul_(2).sub_(1)
 
-    return unpacked.reshape(original_shape)
+    return unpacked.view(-1)[:total_elements].reshape(original_shape)
 
 
 # Function to pack signed weights into 1-bit representation
 def pack_binary_tensor(tensor: torch.Tensor, device: DeviceLikeType):
     """Pack a tensor of +1/-1 values into a compact binary representation."""
-    tensor = (tensor > 0).to(torch.uint8)  # Convert +1 to 1, -1 to 0
-    tensor = tensor.view(-1)  # Flatten
-    packed_tensor = torch.zeros(
-        (tensor.shape[0] + 7) // 8, dtype=torch.uint8, device=device
-    )
-
-    for i in range(8):
-        packed_tensor |= tensor[i::8] << i  # Pack 8 values per byte
-
-    return packed_tensor
+    tensor = (tensor > 0).to(device=device, dtype=torch.uint8)  # +1 -> 1, -1 -> 0
+    tensor = tensor.reshape(-1)  # Flatten
+    # Zero-pad to whole bytes, then pack 8 values per byte in one pass
+    tensor = torch.nn.functional.pad(tensor, (0, -tensor.shape[0] % 8))
+    shifts = torch.arange(8, dtype=torch.uint8, device=tensor.device)
+    # The shifted bits are disjoint, so their sum is their bitwise OR
+    return (tensor.view(-1, 8) << shifts).sum(dim=-1, dtype=torch.uint8)
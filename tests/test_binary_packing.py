@@ -0,0 +1,55 @@
+import torch
+import pytest
+from tplr.neurons import pack_binary_tensor, process_loaded_data, unpack_binary_tensor
+
+
+@pytest.mark.parametrize("shape", [(8,), (4, 16), (2, 3, 8)])
+def test_pack_unpack_roundtrip(shape):
+    torch.manual_seed(0)
+    signs = torch.randn(shape).sign()
+    signs[signs == 0] = 1
+
+    packed = pack_binary_tensor(signs, "cpu")
+    assert packed.dtype == torch.uint8
+    assert packed.numel() == signs.numel() // 8
+
+    unpacked = unpack_binary_tensor(packed, signs.shape)
+    assert unpacked.shape == signs.shape
+    assert unpacked.dtype == torch.float32
+    assert torch.equal(unpacked, signs)
+
+
+def test_unpack_bit_order():
+    # Bit i of byte j maps to element 8 * j + i
+    packed = torch.tensor([0b00000001, 0b10000000], dtype=torch.uint8)
+    unpacked = unpack_binary_tensor(packed, torch.Size([16]))
+    expected = -torch.ones(16)
+    expected[0] = 1
+    expected[15] = 1
+    assert torch.equal(unpacked, expected)
+
+
+def test_unpack_dtype():
+    signs = torch.tensor([1.0, -1.0] * 8)
+    packed = pack_binary_tensor(signs, "cpu")
+    unpacked = unpack_binary_tensor(packed, signs.shape, dtype=torch.bfloat16)
+    assert unpacked.dtype == torch.bfloat16
+    assert torch.equal(unpacked.float(), signs)
+
+
+def test_process_loaded_data_splits_flat_unpack():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.Linear(4, 2))
+    signs = {}
+    state_dict = {"window": 3}
+    for name, param in model.named_parameters():
+        signs[name] = torch.randn(param.shape).sign()
+        signs[name][signs[name] == 0] = 1
+        state_dict[name] = pack_binary_tensor(signs[name], "cpu")
+
+    result = process_loaded_data(model, {"state_dict": state_dict})
+
+    assert result["window"] == 3
+    assert set(result["tensors"]) == set(signs)
+    for name, expected in signs.items():
+        assert torch.equal(result["tensors"][name], expected)
@@ -278,6 +278,15 @@ async def test_get_local(comms_instance):
     assert global_step == test_state_dict["global_step"]
 
 
+async def test_get_local_cleans_once_per_window(comms_instance):
+    """Local reads only trim stale windows when the window advances."""
+    uid = "0"
+    with patch.object(comms_instance, "cleanup_local_data") as mock_cleanup:
+        for window in (1, 1, 1, 2):
+            await comms_instance.get(uid=uid, window=window, key="gradient")
+        assert mock_cleanup.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_gather_basic_functionality(comms_instance):
     """Test 3: Basic Gradient Gathering
@@ -1960,6 +1969,17 @@ def test_invalid_flat_tensor_out_of_range_index():
         dummy_comms.check_compressed_indices("param", invalid_tensor, totalk)
 
 
+def test_invalid_multi_dim_tensor_out_of_range_index():
+    """
+    Test that a multi-dimensional tensor with an out-of-range index in any row raises ValueError naming that index.
+    """
+    dummy_comms = DummyComms()
+    totalk = 10  # allowed_topk = min(3, 10) = 3
+    invalid_tensor = torch.tensor([[0, 1, 2], [3, -4, 5]], dtype=torch.long)
+    with pytest.raises(ValueError, match="Index -4 out of bounds"):
+        dummy_comms.check_compressed_indices("param", invalid_tensor, totalk)
+
+
 def test_invalid_flat_list_wrong_length():
     """
     Test that a flat list whose length is not equal to allowed_topk raises ValueError about the invalid number of indices.
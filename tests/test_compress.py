@@ -0,0 +1,23 @@
+import torch
+import torch.nn as nn
+from tplr.compress import CompressDCT, TransformDCT
+
+
+class DummyModel(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.weight = nn.Parameter(torch.randn(64, 48))
+        self.bias = nn.Parameter(torch.randn(48))
+
+
+def test_shape_metadata_matches_compress():
+    model = DummyModel()
+    transformer = TransformDCT(model, target_chunk=16)
+    compressor = CompressDCT()
+
+    for _, p in model.named_parameters():
+        _, _, xshape, totalk = compressor.compress(transformer.encode(p), 8)
+        assert compressor.topk_shape(transformer.encoded_shape(p.shape)) == (
+            xshape,
+            totalk,
+        )
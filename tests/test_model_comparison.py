@@ -114,6 +114,24 @@ async def test_multiple_steps_behind(setup_model):
     assert result["max_steps_behind"] == pytest.approx(steps_behind, abs=1e-2)
 
 
+@pytest.mark.asyncio
+async def test_length_mismatch_skipped(setup_model):
+    """Debug entries of the wrong length are skipped, not misaligned."""
+    model = setup_model
+    learning_rate = 0.01
+
+    debug_dict = {}
+    for name, param in model.named_parameters():
+        debug_dict[name + "_debug"] = param.flatten()[:2].detach().cpu().tolist()
+    # One short entry must not shift the comparison of the parameters after it
+    debug_dict["linear1.weight_debug"] = [0.5]
+
+    result = await compare_model_with_debug_dict(model, debug_dict, learning_rate)
+
+    assert result["param_count"] == 2 * (len(debug_dict) - 1)
+    assert result["max_diff"] == pytest.approx(0.0, abs=1e-6)
+
+
 @pytest.mark.asyncio
 async def test_missing_parameters(setup_model):
     """Test with a debug dict missing some parameters."""
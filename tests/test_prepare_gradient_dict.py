@@ -497,3 +497,55 @@ def test_propagation_of_transformer_failure():
 
     with pytest.raises(RuntimeError, match="Transformer error"):
         prepare_gradient_dict(miner, pages, step_window)
+
+
+def test_grouped_compression_matches_per_parameter():
+    """
+    Test 12: Grouped Compression Equivalence
+    -----------------------------------------
+    - Use the real DCT transformer and compressor on a model with two parameters of the same shape.
+    - Parameters sharing a shape are top-k compressed in a single call.
+    - Verify the idxs/vals match compressing each parameter on its own, and that each
+      returned tensor owns its storage (no views into the grouped buffer).
+    """
+    from tplr.compress import CompressDCT, TransformDCT
+
+    class DummySameShapeModel(torch.nn.Module):
+        def __init__(self):
+            super(DummySameShapeModel, self).__init__()
+            self.a = torch.nn.Parameter(torch.randn(8, 8))
+            self.b = torch.nn.Parameter(torch.randn(8, 8))
+            self.a.grad = torch.randn(8, 8)
+            self.b.grad = torch.randn(8, 8)
+
+    miner = DummyMiner()
+    miner.model = DummySameShapeModel()
+    miner.hparams.weight_decay = 0.0
+    miner.transformer = TransformDCT(miner.model, target_chunk=4)
+    miner.compressor = CompressDCT()
+    miner.momentum = {n: torch.zeros_like(p) for n, p in miner.model.named_parameters()}
+
+    lr = miner.scheduler.get_last_lr()[0]
+    expected = {}
+    for n, p in miner.model.named_parameters():
+        idxs, vals, xshape, totalk = miner.compressor.compress(
+            miner.transformer.encode(p.grad * lr), miner.hparams.topk_compression
+        )
+        expected[n] = (idxs, vals, xshape, totalk)
+
+    gradient, xshapes, totalks, _ = prepare_gradient_dict(miner, [], 0)
+
+    for n, (idxs, vals, xshape, totalk) in expected.items():
+        # top-k is unsorted, so compare the selections order-independently
+        torch.testing.assert_close(
+            gradient[n + "idxs"].sort(dim=-1).values, idxs.sort(dim=-1).values
+        )
+        torch.testing.assert_close(
+            gradient[n + "vals"].sort(dim=-1).values, vals.sort(dim=-1).values
+        )
+        assert xshapes[n] == xshape
+        assert totalks[n] == totalk
+        assert (
+            gradient[n + "vals"].untyped_storage().nbytes()
+            == gradient[n + "vals"].nbytes
+        )